@@ -1,9 +1,19 @@
 """Integration for Rademacher Bridge."""
+import asyncio
+import importlib
 import logging
+import time
 
+from homepilot.actuator import HomePilotActuator
 from homepilot.api import AuthError, HomePilotApi
+from homepilot.cover import HomePilotCover
 from homepilot.hub import HomePilotHub
+from homepilot.light import HomePilotLight
 from homepilot.manager import HomePilotManager
+from homepilot.sensor import HomePilotSensor
+from homepilot.switch import HomePilotSwitch
+from homepilot.thermostat import HomePilotThermostat
+from homepilot.wallcontroller import HomePilotWallController
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
@@ -23,14 +33,41 @@ from homeassistant.helpers.device_registry import (
     format_mac,
 )
 from homeassistant.helpers.entity_registry import async_migrate_entries
+from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN
-from .state_manager import StateManager
+from .api import RademacherApi
+from .const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+from .discovery import (
+    CATALOGUE_SYNC_INTERVAL,
+    async_build_manager,
+    async_sync_catalogue,
+    discovery_store,
+)
+from .state_manager import StateManager, states_store
 
 # List of platforms to support. There should be a matching .py file for each,
 # eg <cover.py> and <sensor.py>
 PLATFORMS = ["cover", "button", "switch", "sensor", "binary_sensor", "climate", "light", "number", "update", "scene"]
 
+# Device classes which may have entities on each platform. The button
+# and scene platforms are handled in get_platforms.
+PLATFORM_DEVICE_CLASSES = {
+    "cover": (HomePilotCover,),
+    "switch": (HomePilotHub, HomePilotSwitch, HomePilotCover),
+    "sensor": (HomePilotHub, HomePilotSensor, HomePilotThermostat),
+    "binary_sensor": (HomePilotSensor, HomePilotCover, HomePilotWallController),
+    "climate": (HomePilotThermostat,),
+    "light": (HomePilotActuator, HomePilotLight),
+    "number": (HomePilotCover, HomePilotThermostat),
+    "update": (HomePilotHub,),
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -88,69 +125,227 @@ async def async_setup(hass: HomeAssistant, config: dict):
     return True
 
 
+def get_platforms(state_manager: StateManager) -> list[str]:
+    """Platforms which may have entities for the devices and scenes of
+    the hub. Platforms which aren't forwarded are never imported.
+    """
+    platforms = []
+    for platform in PLATFORMS:
+        if platform == "button":
+            needed = bool(state_manager.get_devices(capability="has_ping_cmd"))
+        elif platform == "scene":
+            needed = bool(state_manager.manager.scenes)
+        else:
+            classes = PLATFORM_DEVICE_CLASSES[platform]
+            needed = bool(state_manager.get_devices(classes))
+        if needed:
+            platforms.append(platform)
+    return platforms
+
+
+async def async_import_platforms(
+    hass: HomeAssistant, platforms: list[str]
+) -> dict[str, float]:
+    """Import the platform modules one after another in the executor,
+    returns the seconds each import took. An import includes the modules
+    it loads first, like the entity component of its platform.
+    """
+    timings = {}
+    for platform in platforms:
+        start = time.monotonic()
+        await hass.async_add_import_executor_job(
+            importlib.import_module, f"{__name__}.{platform}"
+        )
+        timings[platform] = time.monotonic() - start
+    return timings
+
+
+async def async_forward_platforms(
+    hass: HomeAssistant, entry: ConfigEntry, platforms: list[str], late=False
+):
+    """Set up the platforms, concurrently. Set late when the entry is
+    already set up.
+    """
+    forward_entry_setups = hass.config_entries.async_forward_entry_setups
+    if late:
+        # Cores before 2024.7 have no separate method for forwarding
+        # after setup
+        forward_entry_setups = getattr(
+            hass.config_entries,
+            "async_late_forward_entry_setups",
+            forward_entry_setups,
+        )
+    await forward_entry_setups(entry, platforms)
+
+
+def get_entry_options(entry: ConfigEntry, manager: HomePilotManager) -> dict:
+    """Options of the entry, with defaults for options added later on."""
+    # Backward compatibility
+    entry_options = {key: entry.options[key] for key in entry.options}
+    if CONF_EXCLUDE not in entry.options:
+        if CONF_DEVICES in entry.options:
+            entry_options[CONF_EXCLUDE] = [
+                did for did in manager.devices if did not in entry.options[CONF_DEVICES]
+            ]
+        else:
+            entry_options[CONF_EXCLUDE] = []
+    if CONF_SENSOR_TYPE not in entry.options:
+        entry_options[CONF_SENSOR_TYPE] = []
+    if CONF_FAST_POLL_INTERVAL not in entry.options:
+        entry_options[CONF_FAST_POLL_INTERVAL] = DEFAULT_FAST_POLL_INTERVAL
+    if CONF_SLOW_POLL_INTERVAL not in entry.options:
+        entry_options[CONF_SLOW_POLL_INTERVAL] = DEFAULT_SLOW_POLL_INTERVAL
+    return entry_options
+
+
+async def async_forward_new_platforms(
+    hass: HomeAssistant, entry: ConfigEntry, state_manager: StateManager
+):
+    """Set up the platforms needed by devices or scenes which were added
+    after the entry was set up.
+    """
+    platforms = [
+        platform
+        for platform in get_platforms(state_manager)
+        if platform not in state_manager.platforms
+    ]
+    if platforms:
+        state_manager.platforms.extend(platforms)
+        await async_import_platforms(hass, platforms)
+        await async_forward_platforms(hass, entry, platforms, late=True)
+
+
+@callback
+def async_remove_devices(hass: HomeAssistant, dids):
+    """Remove devices, and so their entities, from the registry."""
+    device_registry: DeviceRegistry = dr.async_get(hass)
+    for did in dids:
+        device_entry: DeviceEntry = device_registry.async_get_device({(DOMAIN, did)})
+        if device_entry is not None:
+            _LOGGER.info("Deleting device %s", did)
+            device_registry.async_remove_device(device_entry.id)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Rademacher from a config entry."""
+    start = time.monotonic()
     # Store an instance of the "connecting" class that does the work of speaking
     # with your actual devices.
-    api = HomePilotApi(
+    api = RademacherApi(
         entry.data[CONF_HOST],
         entry.data.get(CONF_PASSWORD, ""),
         entry.data.get(CONF_API_VERSION, 1),
     )
     try:
-        manager = await HomePilotManager.async_build_manager(api)
+        # Built from the cache of a previous discovery when available
+        manager, discovery, from_cache = await async_build_manager(hass, entry, api)
     except AuthError as err:
         # Raising ConfigEntryAuthFailed will cancel future updates
         # and start a config flow with SOURCE_REAUTH (async_step_reauth)
         raise ConfigEntryAuthFailed from err
     except Exception as err:
         raise ConfigEntryNotReady from err
+    discovery_time = time.monotonic() - start
 
-    _LOGGER.info("Manager instance created, found %s devices", len(manager.devices))
+    _LOGGER.info(
+        "Manager instance created, found %s devices%s",
+        len(manager.devices),
+        " (cached)" if from_cache else "",
+    )
     _LOGGER.debug("Device IDs: %s", list(manager.devices))
 
-    # Backward compatibility
-    entry_options = {key: entry.options[key] for key in entry.options}
-    if CONF_EXCLUDE not in entry.options:
-        if CONF_DEVICES in entry.options:
-            entry_options[CONF_EXCLUDE] = [
-                did for did in manager.devices if did not in entry.options[CONF_DEVICES]
-            ]
-        else:
-            entry_options[CONF_EXCLUDE] = []
-    if CONF_SENSOR_TYPE not in entry.options:
-        entry_options[CONF_SENSOR_TYPE] = []
+    entry_options = get_entry_options(entry, manager)
 
     state_manager = StateManager(
         hass,
         manager,
         entry.data,
         entry_options,
+        states_store(hass, entry),
     )
 
     hass.data[DOMAIN][entry.entry_id] = state_manager
-    await state_manager.build_update_coordinator()
+    restored = await state_manager.async_restore_states(discovery)
+    await state_manager.build_update_coordinator(restored)
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     # Deleting excluded devices
-    device_registry: DeviceRegistry = dr.async_get(hass)
-    for did in entry.options[CONF_EXCLUDE]:
-        device_entry: DeviceEntry = device_registry.async_get_device({(DOMAIN, did)})
-        if device_entry is not None:
-            _LOGGER.info("Deleting device %s", did)
-            device_registry.async_remove_device(device_entry.id)
+    async_remove_devices(hass, entry_options[CONF_EXCLUDE])
 
-    _LOGGER.info("Starting entry setup for each platform")
+    state_manager.platforms = get_platforms(state_manager)
+    _LOGGER.info("Starting entry setup for platforms: %s", state_manager.platforms)
     # This creates each HA object for each platform your device requires.
     # It's done by calling the `async_setup_entry` function in each platform module.
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Imported one at a time beforehand, so each import is timed on its
+    # own and done in the executor. The platforms are set up concurrently,
+    # their setup is only timed as a whole.
+    import_timings = await async_import_platforms(hass, state_manager.platforms)
+    platforms_start = time.monotonic()
+    await async_forward_platforms(hass, entry, state_manager.platforms)
+    state_manager.setup_timings = {
+        "total": time.monotonic() - start,
+        "discovery": discovery_time,
+        "imports": sum(import_timings.values()),
+        "platforms": time.monotonic() - platforms_start,
+        **{f"import_{platform}": t for platform, t in import_timings.items()},
+    }
+    _LOGGER.info(
+        "Setup took %.3f s (discovery %.3f s, imports %.3f s, platforms %.3f s)",
+        state_manager.setup_timings["total"],
+        discovery_time,
+        state_manager.setup_timings["imports"],
+        state_manager.setup_timings["platforms"],
+    )
+    _LOGGER.debug("Platform import times: %s", import_timings)
+
+    @callback
+    def sync_catalogue(_now=None):
+        entry.async_create_background_task(
+            hass, async_sync_devices(hass, entry), "rademacher catalogue sync"
+        )
+
+    # Devices and scenes added or removed on the hub later on, separate
+    # from state polling
+    entry.async_on_unload(
+        async_track_time_interval(hass, sync_catalogue, CATALOGUE_SYNC_INTERVAL)
+    )
+    if from_cache:
+        # The cache may be outdated already
+        sync_catalogue()
     return True
 
 
+async def async_sync_devices(hass: HomeAssistant, entry: ConfigEntry):
+    """Add, remove or rename the devices and scenes which changed on
+    the hub, without a reload.
+    """
+    state_manager: StateManager = hass.data[DOMAIN][entry.entry_id]
+    try:
+        async with asyncio.timeout(60):
+            removed = await async_sync_catalogue(hass, entry, state_manager)
+    except AuthError:
+        # Reported by the coordinator
+        return
+    except Exception as err:
+        _LOGGER.warning("Cannot sync the devices and scenes of the hub: %s", err)
+        return
+    async_remove_devices(hass, removed)
+    await async_forward_new_platforms(hass, entry, state_manager)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update. Only the entities of devices which were
+    excluded or included are removed or added, without a reload.
+    """
+    state_manager: StateManager = hass.data[DOMAIN][entry.entry_id]
+    state_manager.async_update_options(
+        get_entry_options(entry, state_manager.manager)
+    )
+    async_remove_devices(hass, state_manager.excluded_devices)
+
+    # Included devices may need platforms which weren't set up before
+    await async_forward_new_platforms(hass, entry, state_manager)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -158,8 +353,27 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     # This is called when an entry/configured device is to be removed. The class
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
-    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    state_manager: StateManager = hass.data[DOMAIN][entry.entry_id]
+    unloaded = await hass.config_entries.async_unload_platforms(
+        entry, state_manager.platforms
+    )
     if unloaded:
         hass.data[DOMAIN].pop(entry.entry_id)
+        state_manager.async_shutdown()
+        await state_manager.async_close_store()
 
     return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the caches of a removed config entry."""
+    state_manager: StateManager | None = hass.data.get(DOMAIN, {}).pop(
+        entry.entry_id, None
+    )
+    if state_manager is not None:
+        # The entry failed to unload, its states must not be saved after
+        # the file was removed
+        state_manager.async_shutdown()
+        await state_manager.async_close_store()
+    await discovery_store(hass, entry).async_remove()
+    await states_store(hass, entry).async_remove()
@@ -0,0 +1,206 @@
+"""API client for Rademacher Bridge."""
+from collections import deque
+from contextlib import contextmanager
+import copy
+import time
+
+from homepilot.api import HomePilotApi
+
+
+class DiscoveryCacheMiss(Exception):
+    """A discovery response is missing from the cache."""
+
+
+class TrafficReplayMiss(Exception):
+    """A response is missing from the replayed traffic."""
+
+
+class TrafficReplayError(Exception):
+    """A request which failed while the traffic was recorded."""
+
+
+class RademacherApi(HomePilotApi):
+    """HomePilotApi which can record the responses used for discovering
+    the devices and scenes of the hub, and replay them later on.
+
+    Only the requests made while recording or replaying are affected, all
+    other requests always go to the hub.
+
+    Independently, all reads from the hub can be recorded with their timing
+    (see start_traffic_recording) and replayed, for profiling.
+
+    The library opens a new HTTP session, and so a new connection, for
+    every call (see tests/test_api.py), there is no way to pass it a shared
+    one. A single instance is used per config entry (including the options
+    flow and the device sync) so that the hub is logged into only once. After setup, all requests go through the
+    scheduler of the state manager, including those devices make while
+    applying their state, so at most MAX_CONCURRENT_REQUESTS connections
+    are open at the same time.
+    """
+
+    def __init__(self, host, password, api_version=1) -> None:
+        super().__init__(host, password, api_version)
+        self._recording: dict | None = None
+        self._replaying: dict | None = None
+        self._traffic: list | None = None
+        self._traffic_replay: dict | None = None
+
+    @contextmanager
+    def record_discovery(self):
+        """Record the discovery responses into the yielded dict."""
+        self._recording = responses = {}
+        try:
+            yield responses
+        finally:
+            self._recording = None
+
+    @contextmanager
+    def replay_discovery(self, responses: dict):
+        """Answer discovery requests from previously recorded responses."""
+        self._replaying = responses
+        try:
+            yield
+        finally:
+            self._replaying = None
+
+    @property
+    def traffic(self) -> list | None:
+        """The traffic recorded so far, None if not recording."""
+        return self._traffic
+
+    def start_traffic_recording(self):
+        """Record all reads from the hub as [start, duration, name, args,
+        response, error] lists. Start is the wall clock time, error the
+        message of a failed request (with no response).
+        """
+        self._traffic = []
+
+    def take_traffic(self) -> list:
+        """Return the traffic recorded since the last call, and keep
+        recording.
+        """
+        traffic = self._traffic or []
+        if self._traffic is not None:
+            self._traffic = []
+        return traffic
+
+    def stop_traffic_recording(self) -> list:
+        """Stop recording and return the traffic not taken yet."""
+        traffic, self._traffic = self._traffic or [], None
+        return traffic
+
+    @contextmanager
+    def replay_traffic(self, traffic: list):
+        """Answer reads from recorded traffic. Repeated requests get the
+        recorded responses in order, the last one once all were used.
+        """
+        replies = {}
+        for _start, _duration, name, args, response, error in traffic:
+            replies.setdefault((name, tuple(args)), deque()).append((response, error))
+        self._traffic_replay = replies
+        try:
+            yield
+        finally:
+            self._traffic_replay = None
+
+    async def _async_traffic_request(self, name, request, *args):
+        if self._traffic_replay is not None:
+            replies = self._traffic_replay.get((name, args))
+            if not replies:
+                raise TrafficReplayMiss(f"{name}{args}")
+            response, error = replies.popleft() if len(replies) > 1 else replies[0]
+            if error is not None:
+                raise TrafficReplayError(error)
+            return copy.deepcopy(response)
+        if self._traffic is None:
+            return await request(*args)
+        traffic = self._traffic
+        start = time.time()
+        try:
+            response = await request(*args)
+        except BaseException as err:
+            traffic.append([start, time.time() - start, name, args, None, repr(err)])
+            raise
+        traffic.append(
+            [start, time.time() - start, name, args, copy.deepcopy(response), None]
+        )
+        return response
+
+    async def _async_discovery_request(self, key, request, *args):
+        if self._replaying is not None:
+            if key not in self._replaying:
+                raise DiscoveryCacheMiss(key)
+            return copy.deepcopy(self._replaying[key])
+        response = await request(*args)
+        if self._recording is not None:
+            self._recording[key] = copy.deepcopy(response)
+        return response
+
+    async def get_devices(self):
+        return await self._async_discovery_request(
+            "devices",
+            self._async_traffic_request,
+            "get_devices",
+            super().get_devices,
+        )
+
+    async def get_device(self, did):
+        return await self._async_discovery_request(
+            f"device/{did}",
+            self._async_traffic_request,
+            "get_device",
+            super().get_device,
+            did,
+        )
+
+    async def async_get_fw_version(self):
+        return await self._async_discovery_request(
+            "fw_version",
+            self._async_traffic_request,
+            "async_get_fw_version",
+            super().async_get_fw_version,
+        )
+
+    async def async_get_interfaces(self):
+        return await self._async_discovery_request(
+            "interfaces",
+            self._async_traffic_request,
+            "async_get_interfaces",
+            super().async_get_interfaces,
+        )
+
+    async def async_get_nodename(self):
+        return await self._async_discovery_request(
+            "nodename",
+            self._async_traffic_request,
+            "async_get_nodename",
+            super().async_get_nodename,
+        )
+
+    async def async_get_scenes(self):
+        return await self._async_discovery_request(
+            "scenes",
+            self._async_traffic_request,
+            "async_get_scenes",
+            super().async_get_scenes,
+        )
+
+    async def async_get_devices_state(self):
+        return await self._async_traffic_request(
+            "async_get_devices_state", super().async_get_devices_state
+        )
+
+    async def async_get_device_state(self, did):
+        return await self._async_traffic_request(
+            "async_get_device_state", super().async_get_device_state, did
+        )
+
+    async def async_get_fw_status(self):
+        return await self._async_traffic_request(
+            "async_get_fw_status", super().async_get_fw_status
+        )
+
+    async def async_get_led_status(self):
+        return await self._async_traffic_request(
+            "async_get_led_status", super().async_get_led_status
+        )
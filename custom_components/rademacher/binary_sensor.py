@@ -1,9 +1,7 @@
 """Platform for Rademacher Bridge."""
-from datetime import timedelta
 import logging
 
 from homepilot.cover import HomePilotCover
-from homepilot.device import HomePilotDevice
 from homepilot.sensor import HomePilotSensor
 from homepilot.wallcontroller import HomePilotWallController
 
@@ -12,9 +10,8 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_EXCLUDE, CONF_SENSOR_TYPE
+from homeassistant.const import CONF_SENSOR_TYPE
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.event import async_track_time_interval
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -26,168 +23,164 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry: ConfigEntry, async_add_entities):
     """Setup of entities for binary_sensor platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
-    ternary_contact_sensors: list[str] = state_manager.entry_options[CONF_SENSOR_TYPE]
+    state_manager.async_setup_platform("binary_sensor", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the binary_sensor entities of the devices which aren't excluded."""
+    ternary_contact_sensors = set(state_manager.entry_options[CONF_SENSOR_TYPE])
     new_entities = []
 
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotSensor):
-                if device.has_rain_detection:
-                    _LOGGER.info(
-                        "Found Rain Detection Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="rain_detect",
-                            name_suffix="Rain Detection",
-                            value_attr="rain_detection_value",
-                            device_class=BinarySensorDeviceClass.MOISTURE,
-                        )
-                    )
-                if device.has_sun_detection:
-                    _LOGGER.info(
-                        "Found Sun Detection Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="sun_detect",
-                            name_suffix="Sun Detection",
-                            value_attr="sun_detection_value",
-                            device_class=BinarySensorDeviceClass.LIGHT,
-                        )
-                    )
-                if device.has_wind_detection:
-                    _LOGGER.info(
-                        "Found Wind Detection Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="wind_detect",
-                            name_suffix="Wind Detection",
-                            value_attr="wind_detection_value",
-                            device_class=None,
-                            icon_off="mdi:weather-windy",
-                            icon_on="mdi:weather-windy",
-                        )
-                    )
-                if device.has_contact_state and device.did not in ternary_contact_sensors:
-                    _LOGGER.info("Found Contact Sensor for Device ID: %s", device.did)
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="contact_state",
-                            name_suffix="Contact State",
-                            value_attr="contact_state_value",
-                            device_class=BinarySensorDeviceClass.OPENING,
-                        )
-                    )
-                if device.has_motion_detection:
-                    _LOGGER.info("Found Motion Sensor for Device ID: %s", device.did)
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="motion_sensor",
-                            name_suffix="Motion Sensor",
-                            value_attr="motion_detection_value",
-                            device_class=BinarySensorDeviceClass.MOTION,
-                        )
-                    )
-                if device.has_smoke_detection:
-                    _LOGGER.info("Found Smoke Sensor for Device ID: %s", device.did)
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="smoke_detect",
-                            name_suffix="Smoke Detection",
-                            value_attr="smoke_detection_value",
-                            device_class=BinarySensorDeviceClass.SMOKE,
-                        )
-                    )
-            if isinstance(device, HomePilotCover):
-                if device.has_blocking_detection:
-                    _LOGGER.info(
-                        "Found Blocking Detection Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="blocking_detection",
-                            name_suffix="Blocking Detection",
-                            value_attr="blocking_detection_status",
-                            device_class=BinarySensorDeviceClass.PROBLEM,
-                            icon_off="mdi:window-shutter",
-                            icon_on="mdi:window-shutter-alert",
-                            entity_category=EntityCategory.DIAGNOSTIC,
-                        )
-                    )
-                if device.has_obstacle_detection:
-                    _LOGGER.info(
-                        "Found Obstacle Detection Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="obstacle_detection",
-                            name_suffix="Obstacle Detection",
-                            value_attr="obstacle_detection_status",
-                            device_class=BinarySensorDeviceClass.PROBLEM,
-                            icon_off="mdi:window-shutter",
-                            icon_on="mdi:window-shutter-alert",
-                            entity_category=EntityCategory.DIAGNOSTIC,
-                        )
-                    )
-            if isinstance(device, HomePilotWallController):
-                channels = device.channels
-                if channels is not None:
-                    _LOGGER.info("Found Wall Controller with %s Button(s) for Device ID: %s", str(len(channels)), device.did)
-                    for channel in channels:
-                        _LOGGER.info("Adding Wall Controller Button: %s", channel)
-                        new_entities.append(
-                            HomePilotBinarySensorEntity(
-                                state_manager=state_manager,
-                                device=device,
-                                id_suffix=channel,
-                                name_suffix=channel,
-                                value_attr=f"channel_{channel}",
-                                device_class=BinarySensorDeviceClass.RUNNING,
-                                has_channels=True,
-                                should_poll=channel == 1 #Only the first Channel needs to poll data of device
-                            )
-                        )
-                else:
-                    _LOGGER.info("No Wall Controller Channels for Device ID: %s", device.did)
-                if device.has_battery_low:
-                    _LOGGER.info(
-                        "Found Battery Low Event for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotBinarySensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="battery_low",
-                            name_suffix="Battery Low",
-                            value_attr="battery_low_value",
-                            device_class=BinarySensorDeviceClass.BATTERY,
-                            entity_category=EntityCategory.DIAGNOSTIC,
-                        )
+    for device in state_manager.get_devices(HomePilotSensor):
+        if device.has_rain_detection:
+            _LOGGER.debug(
+                "Found Rain Detection Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="rain_detect",
+                    name_suffix="Rain Detection",
+                    value_attr="rain_detection_value",
+                    device_class=BinarySensorDeviceClass.MOISTURE,
+                )
+            )
+        if device.has_sun_detection:
+            _LOGGER.debug(
+                "Found Sun Detection Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="sun_detect",
+                    name_suffix="Sun Detection",
+                    value_attr="sun_detection_value",
+                    device_class=BinarySensorDeviceClass.LIGHT,
+                )
+            )
+        if device.has_wind_detection:
+            _LOGGER.debug(
+                "Found Wind Detection Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="wind_detect",
+                    name_suffix="Wind Detection",
+                    value_attr="wind_detection_value",
+                    device_class=None,
+                    icon_off="mdi:weather-windy",
+                    icon_on="mdi:weather-windy",
+                )
+            )
+        if device.has_contact_state and device.did not in ternary_contact_sensors:
+            _LOGGER.debug("Found Contact Sensor for Device ID: %s", device.did)
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="contact_state",
+                    name_suffix="Contact State",
+                    value_attr="contact_state_value",
+                    device_class=BinarySensorDeviceClass.OPENING,
+                )
+            )
+        if device.has_motion_detection:
+            _LOGGER.debug("Found Motion Sensor for Device ID: %s", device.did)
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="motion_sensor",
+                    name_suffix="Motion Sensor",
+                    value_attr="motion_detection_value",
+                    device_class=BinarySensorDeviceClass.MOTION,
+                )
+            )
+        if device.has_smoke_detection:
+            _LOGGER.debug("Found Smoke Sensor for Device ID: %s", device.did)
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="smoke_detect",
+                    name_suffix="Smoke Detection",
+                    value_attr="smoke_detection_value",
+                    device_class=BinarySensorDeviceClass.SMOKE,
+                )
+            )
+    for device in state_manager.get_devices(HomePilotCover):
+        if device.has_blocking_detection:
+            _LOGGER.debug(
+                "Found Blocking Detection Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="blocking_detection",
+                    name_suffix="Blocking Detection",
+                    value_attr="blocking_detection_status",
+                    device_class=BinarySensorDeviceClass.PROBLEM,
+                    icon_off="mdi:window-shutter",
+                    icon_on="mdi:window-shutter-alert",
+                    entity_category=EntityCategory.DIAGNOSTIC,
+                )
+            )
+        if device.has_obstacle_detection:
+            _LOGGER.debug(
+                "Found Obstacle Detection Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="obstacle_detection",
+                    name_suffix="Obstacle Detection",
+                    value_attr="obstacle_detection_status",
+                    device_class=BinarySensorDeviceClass.PROBLEM,
+                    icon_off="mdi:window-shutter",
+                    icon_on="mdi:window-shutter-alert",
+                    entity_category=EntityCategory.DIAGNOSTIC,
+                )
+            )
+    for device in state_manager.get_devices(HomePilotWallController):
+        channels = device.channels
+        if channels is not None:
+            _LOGGER.debug("Found Wall Controller with %s Button(s) for Device ID: %s", str(len(channels)), device.did)
+            for channel in channels:
+                _LOGGER.debug("Adding Wall Controller Button: %s", channel)
+                new_entities.append(
+                    HomePilotBinarySensorEntity(
+                        state_manager=state_manager,
+                        device=device,
+                        id_suffix=channel,
+                        name_suffix=channel,
+                        value_attr=f"channel_{channel}",
+                        device_class=BinarySensorDeviceClass.RUNNING,
                     )
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+                )
+        else:
+            _LOGGER.debug("No Wall Controller Channels for Device ID: %s", device.did)
+        if device.has_battery_low:
+            _LOGGER.debug(
+                "Found Battery Low Event for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotBinarySensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="battery_low",
+                    name_suffix="Battery Low",
+                    value_attr="battery_low_value",
+                    device_class=BinarySensorDeviceClass.BATTERY,
+                    entity_category=EntityCategory.DIAGNOSTIC,
+                )
+            )
+    return new_entities
 
 
 class HomePilotBinarySensorEntity(HomePilotEntity, BinarySensorEntity):
@@ -204,8 +197,6 @@ class HomePilotBinarySensorEntity(HomePilotEntity, BinarySensorEntity):
         entity_category=None,
         icon_on=None,
         icon_off=None,
-        has_channels=False,
-        should_poll=True,
     ):
         super().__init__(
             state_manager,
@@ -218,33 +209,6 @@ class HomePilotBinarySensorEntity(HomePilotEntity, BinarySensorEntity):
         self._value_attr = value_attr
         self._icon_on = icon_on
         self._icon_off = icon_off
-        self._has_channels = has_channels
-        self._should_poll = should_poll
-
-    async def async_added_to_hass(self) -> None:
-        """Set up a timer for updating."""
-        if self._has_channels:
-            self.async_on_remove(
-                async_track_time_interval(
-                    self.hass, self._data_refresh, timedelta(seconds=2)
-                )
-            )
-
-    async def _data_poll(self):
-        _LOGGER.debug("### Pull data for Device ID: %s, %s, entity_id: %s", self.did, self._value_attr, self.entity_id)
-        if isinstance(self.coordinator.data[self.did], HomePilotWallController):
-            device: HomePilotWallController = self.coordinator.data[self.did]
-            await device.update_channels()
-            await self.coordinator.async_request_refresh()
-
-    async def _data_refresh(self, event_time):
-        if self._should_poll:
-            await self._data_poll()
-        self.async_write_ha_state()
-
-    @property
-    def should_poll(self):
-        return self._should_poll
 
     @property
     def value_attr(self):
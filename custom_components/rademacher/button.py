@@ -4,7 +4,6 @@ import logging
 from homepilot.device import HomePilotDevice
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.const import CONF_EXCLUDE
 from homeassistant.helpers.entity import EntityCategory
 
 from .const import DOMAIN
@@ -17,18 +16,16 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for button platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("button", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the button entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if device.has_ping_cmd:
-                _LOGGER.info("Found Ping Command Button for Device ID: %s", device.did)
-                new_entities.append(HomePilotPingButtonEntity(state_manager, device))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(capability="has_ping_cmd"):
+        _LOGGER.debug("Found Ping Command Button for Device ID: %s", device.did)
+        new_entities.append(HomePilotPingButtonEntity(state_manager, device))
+    return new_entities
 
 
 class HomePilotPingButtonEntity(HomePilotEntity, ButtonEntity):
@@ -58,5 +55,5 @@ class HomePilotPingButtonEntity(HomePilotEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         device: HomePilotDevice = self.coordinator.data[self.did]
-        await device.async_ping()
+        await self.async_send_command(device.async_ping)
         await self.async_update_device_state()
@@ -1,12 +1,11 @@
 """Platform for Rademacher Bridge."""
 import logging
 
-from homepilot.device import HomePilotDevice
 from homepilot.thermostat import HomePilotThermostat
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import ClimateEntityFeature, HVACMode
-from homeassistant.const import CONF_EXCLUDE, UnitOfTemperature
+from homeassistant.const import UnitOfTemperature
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -18,24 +17,22 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for sensor platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("climate", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the climate entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotThermostat):
-                _LOGGER.info("Found Thermostat for Device ID: %s", device.did)
-                new_entities.append(
-                    HomePilotClimateEntity(
-                        state_manager,
-                        device,
-                        UnitOfTemperature.CELSIUS,
-                    )
-                )
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(HomePilotThermostat):
+        _LOGGER.debug("Found Thermostat for Device ID: %s", device.did)
+        new_entities.append(
+            HomePilotClimateEntity(
+                state_manager,
+                device,
+                UnitOfTemperature.CELSIUS,
+            )
+        )
+    return new_entities
 
 
 class HomePilotClimateEntity(HomePilotEntity, ClimateEntity):
@@ -68,13 +65,18 @@ class HomePilotClimateEntity(HomePilotEntity, ClimateEntity):
         device: HomePilotThermostat = self.coordinator.data[self.did]
         if device.has_auto_mode:
             async with self.async_state_change_context():
-                await device.async_set_auto_mode(hvac_mode == HVACMode.AUTO)
+                await self.async_send_command(
+                    device.async_set_auto_mode, hvac_mode == HVACMode.AUTO
+                )
 
     async def async_set_temperature(self, **kwargs) -> None:
         device: HomePilotThermostat = self.coordinator.data[self.did]
-        if device.can_set_target_temperature:
-            async with self.async_state_change_context():
-                await device.async_set_target_temperature(kwargs["temperature"])
+        if device.can_set_target_temperature and await self.async_send_setpoint(
+            "target_temperature",
+            device.async_set_target_temperature,
+            kwargs["temperature"],
+        ):
+            await self.async_update_device_state()
 
     @property
     def current_temperature(self) -> float:
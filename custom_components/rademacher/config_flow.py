@@ -3,6 +3,7 @@ import logging
 import socket
 
 from homepilot.api import AuthError, CannotConnect, HomePilotApi
+from homepilot.hub import HomePilotHub
 from homepilot.manager import HomePilotManager
 from homepilot.sensor import HomePilotSensor
 import voluptuous as vol
@@ -22,7 +23,14 @@ from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.device_registry import format_mac
 
-from .const import DOMAIN
+from .const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,13 +77,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         api = HomePilotApi(
             self.host, self.password, self.api_version
         )  # password can be empty if not defined ("")
-        manager = await HomePilotManager.async_build_manager(api)
-        self.hostname = await manager.get_nodename()
+        self.hostname = (await api.async_get_nodename())["nodename"]
         if not self.mac_address:
-            self.mac_address = format_mac(await manager.get_hub_macaddress())
+            # Abort for configured hubs before discovering all devices
+            self.mac_address = format_mac(await HomePilotHub.get_hub_macaddress(api))
             await self.async_set_unique_id(self.mac_address)
             self._abort_if_unique_id_configured(updates={CONF_HOST: self.host})
 
+        manager = await HomePilotManager.async_build_manager(api)
         if not manager.devices:
             return self.async_abort(reason="no_devices_found")
         data_schema_config = self.build_data_schema(manager.devices)
@@ -346,17 +355,29 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             data = {
                 CONF_EXCLUDE: user_input[CONF_EXCLUDE],
                 CONF_SENSOR_TYPE: user_input.get(CONF_SENSOR_TYPE, []),
+                CONF_FAST_POLL_INTERVAL: user_input[CONF_FAST_POLL_INTERVAL],
+                CONF_SLOW_POLL_INTERVAL: user_input[CONF_SLOW_POLL_INTERVAL],
             }
             return self.async_create_entry(title=f"{self.hostname} ({self.mac_address})", data=data)
         self.host = self.config_entry.data[CONF_HOST]
         self.password = self.config_entry.data.get(CONF_PASSWORD, "")
         self.api_version = self.config_entry.data.get(CONF_API_VERSION, 1)
-        api = HomePilotApi(
-            self.host, self.password, self.api_version
-        )  # password can be empty if not defined ("")
-        manager = await HomePilotManager.async_build_manager(api)
-        self.mac_address = format_mac(await manager.get_hub_macaddress())
-        self.hostname = await manager.get_nodename()
+        state_manager = self.hass.data.get(DOMAIN, {}).get(
+            self.config_entry.entry_id
+        )
+        if state_manager is not None:
+            # The entry is loaded, use its devices instead of discovering
+            # them again
+            manager = state_manager.manager
+            self.mac_address = self.config_entry.unique_id
+            self.hostname = manager.devices["-1"].nodename
+        else:
+            api = HomePilotApi(
+                self.host, self.password, self.api_version
+            )  # password can be empty if not defined ("")
+            manager = await HomePilotManager.async_build_manager(api)
+            self.mac_address = format_mac(await manager.get_hub_macaddress())
+            self.hostname = await manager.get_nodename()
         if not manager.devices:
             return self.async_abort(reason="no_devices_found")
 
@@ -376,15 +397,30 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             ]
         else:
             previous_ternary_contact_sensors = []
+        previous_fast_poll_interval = self.config_entry.options.get(
+            CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL
+        )
+        previous_slow_poll_interval = self.config_entry.options.get(
+            CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL
+        )
 
         data_schema_config = self.build_data_schema(
-            manager.devices, previous_excluded_devices, previous_ternary_contact_sensors
+            manager.devices,
+            previous_excluded_devices,
+            previous_ternary_contact_sensors,
+            previous_fast_poll_interval,
+            previous_slow_poll_interval,
         )
 
         return self.async_show_form(step_id="init", data_schema=data_schema_config)
 
     def build_data_schema(
-        self, devices, previous_excluded_devices, previous_ternary_contact_sensors
+        self,
+        devices,
+        previous_excluded_devices,
+        previous_ternary_contact_sensors,
+        previous_fast_poll_interval,
+        previous_slow_poll_interval,
     ):
         devices_to_exclude = {
             did: f"{devices[did].name} (id: {devices[did].did})" for did in devices
@@ -411,6 +447,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     ): cv.multi_select(contact_sensors)
                 }
             )
+        schema = schema.extend(
+            {
+                vol.Optional(
+                    CONF_FAST_POLL_INTERVAL, default=previous_fast_poll_interval
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=DEFAULT_POLL_INTERVAL)
+                ),
+                vol.Optional(
+                    CONF_SLOW_POLL_INTERVAL, default=previous_slow_poll_interval
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=DEFAULT_POLL_INTERVAL, max=3600)
+                ),
+            }
+        )
         return schema
 
 
@@ -1,3 +1,11 @@
 """Constants for the rademacher integration."""
 
 DOMAIN = "rademacher"
+
+CONF_FAST_POLL_INTERVAL = "fast_poll_interval"
+CONF_SLOW_POLL_INTERVAL = "slow_poll_interval"
+
+# Polling intervals in seconds
+DEFAULT_POLL_INTERVAL = 10
+DEFAULT_FAST_POLL_INTERVAL = 2
+DEFAULT_SLOW_POLL_INTERVAL = 60
@@ -3,7 +3,6 @@ import logging
 from typing import Any
 
 from homepilot.cover import CoverType, HomePilotCover
-from homepilot.device import HomePilotDevice
 
 from homeassistant.components.cover import (
     ATTR_POSITION,
@@ -12,7 +11,6 @@ from homeassistant.components.cover import (
     CoverEntity,
     CoverEntityFeature,
 )
-from homeassistant.const import CONF_EXCLUDE
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -24,18 +22,16 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for cover platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("cover", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the cover entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotCover):
-                _LOGGER.info("Found Cover for Device ID: %s", device.did)
-                new_entities.append(HomePilotCoverEntity(state_manager, device))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(HomePilotCover):
+        _LOGGER.debug("Found Cover for Device ID: %s", device.did)
+        new_entities.append(HomePilotCoverEntity(state_manager, device))
+    return new_entities
 
 
 class HomePilotCoverEntity(HomePilotEntity, CoverEntity):
@@ -98,40 +94,44 @@ class HomePilotCoverEntity(HomePilotEntity, CoverEntity):
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_open_cover()
+        await self.async_send_command(device.async_open_cover)
         await self.async_update_device_state()
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_close_cover()
+        await self.async_send_command(device.async_close_cover)
         await self.async_update_device_state()
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_set_cover_position(kwargs[ATTR_POSITION])
+        await self.async_send_command(
+            device.async_set_cover_position, kwargs[ATTR_POSITION]
+        )
         await self.async_update_device_state()
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
         async with self.async_state_change_context():
-            await device.async_stop_cover()
+            await self.async_send_command(device.async_stop_cover)
 
     async def async_open_cover_tilt(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_open_cover_tilt()
+        await self.async_send_command(device.async_open_cover_tilt)
         await self.async_update_device_state()
 
     async def async_close_cover_tilt(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_close_cover_tilt()
+        await self.async_send_command(device.async_close_cover_tilt)
         await self.async_update_device_state()
 
     async def async_set_cover_tilt_position(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_set_cover_tilt_position(kwargs[ATTR_TILT_POSITION])
+        await self.async_send_command(
+            device.async_set_cover_tilt_position, kwargs[ATTR_TILT_POSITION]
+        )
         await self.async_update_device_state()
 
     async def async_stop_cover_tilt(self, **kwargs: Any) -> None:
         device: HomePilotCover = self.coordinator.data[self.did]
         async with self.async_state_change_context():
-            await device.async_stop_cover_tilt()
+            await self.async_send_command(device.async_stop_cover_tilt)
@@ -0,0 +1,78 @@
+"""Diagnostics support for Rademacher."""
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .state_manager import StateManager
+
+TO_REDACT = {
+    CONF_HOST,
+    CONF_PASSWORD,
+    "name",
+    "description",
+    "uid",
+    "address",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    state_manager: StateManager = hass.data[DOMAIN][entry.entry_id]
+    now = time.time()
+    devices = {}
+    states = {}
+    for did, device in state_manager.manager.devices.items():
+        state = state_manager.get_last_state(did)
+        devices[did] = {
+            "type": type(device).__name__,
+            "available": getattr(device, "available", None),
+            "excluded": did in state_manager.excluded_devices,
+            # Seconds since the state was queried from the hub
+            "state_age": now - state["_ts"] if state and "_ts" in state else None,
+        }
+        states[did] = state
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "setup_timings": state_manager.setup_timings,
+        "polling": {
+            "interval": state_manager.coordinator.update_interval.total_seconds(),
+            "last_poll": state_manager.last_poll,
+            "durations": state_manager.poll_durations.as_dict(),
+        },
+        "requests": {
+            name: histogram.as_dict()
+            for name, histogram in sorted(state_manager.request_times.items())
+        },
+        "scheduler": {
+            "active": state_manager.scheduler.active,
+            "pending": state_manager.scheduler.pending,
+        },
+        "commands": {
+            metric: histogram.as_dict()
+            for metric, histogram in state_manager.command_times.items()
+        },
+        "device_commands": {
+            f"{did} {command}": {
+                metric: histogram.as_dict() for metric, histogram in histograms.items()
+            }
+            for (did, command), histograms in sorted(
+                state_manager.device_command_times.items()
+            )
+        },
+        "timeouts": state_manager.timeouts,
+        "availability_flips": state_manager.availability_flips,
+        "state_writes": state_manager.state_writes,
+        "devices": devices,
+        "states": async_redact_data(states, TO_REDACT),
+    }
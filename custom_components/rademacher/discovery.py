@@ -0,0 +1,194 @@
+"""Cache of the devices and scenes discovered on the hub."""
+from datetime import timedelta
+import logging
+
+from homepilot.const import (
+    APICAP_DEVICE_TYPE_LOC,
+    APICAP_ID_DEVICE_LOC,
+    APICAP_NAME_DEVICE_LOC,
+    APICAP_PROD_CODE_DEVICE_LOC,
+    APICAP_PROT_ID_DEVICE_LOC,
+    APICAP_VERSION_CFG,
+)
+from homepilot.device import HomePilotDevice
+from homepilot.manager import HomePilotManager
+from homepilot.scenes import HomePilotScene
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import RademacherApi
+from .const import DOMAIN
+from .scheduler import PRIORITY_POLL
+from .state_manager import StateManager
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Interval for checking the hub for added, removed or renamed devices
+# and scenes
+CATALOGUE_SYNC_INTERVAL = timedelta(minutes=10)
+
+# Capabilities whose values identify a device. The values of all other
+# capabilities are states, they change without the device changing.
+IDENTITY_CAPABILITIES = {
+    APICAP_DEVICE_TYPE_LOC,
+    APICAP_ID_DEVICE_LOC,
+    APICAP_NAME_DEVICE_LOC,
+    APICAP_PROD_CODE_DEVICE_LOC,
+    APICAP_PROT_ID_DEVICE_LOC,
+    APICAP_VERSION_CFG,
+}
+
+
+class EmptyCatalogue(Exception):
+    """The hub returned no devices or no scenes, which it also does when
+    it fails to answer.
+    """
+
+
+def discovery_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Store holding the discovery responses of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.discovery")
+
+
+def device_identity(device: dict) -> dict:
+    """The values of the capabilities which identify a device, from its
+    entry in the device list or its own response.
+    """
+    capabilities = HomePilotDevice.get_capabilities_map(device) if device else {}
+    return {
+        name: capability.get("value")
+        for name, capability in capabilities.items()
+        if name in IDENTITY_CAPABILITIES
+    }
+
+
+async def async_discover(api: RademacherApi) -> tuple[HomePilotManager, dict]:
+    """Discover the devices and scenes on the hub. Returns the manager and
+    the responses it was built from.
+    """
+    with api.record_discovery() as responses:
+        manager = await HomePilotManager.async_build_manager(api)
+    return manager, responses
+
+
+async def async_build_manager(
+    hass: HomeAssistant, entry: ConfigEntry, api: RademacherApi
+) -> tuple[HomePilotManager, dict, bool]:
+    """Build the manager from the cached discovery responses, or from the
+    hub if there are none. Returns the manager, the responses it was
+    built from and whether they came from the cache.
+    """
+    store = discovery_store(hass, entry)
+    responses = await store.async_load()
+    if responses:
+        try:
+            with api.replay_discovery(responses):
+                manager = await HomePilotManager.async_build_manager(api)
+            return manager, responses, True
+        except Exception as err:
+            _LOGGER.debug("Cannot use the cached discovery: %s", err)
+
+    manager, responses = await async_discover(api)
+    await store.async_save(responses)
+    return manager, responses, False
+
+
+async def async_sync_catalogue(
+    hass: HomeAssistant, entry: ConfigEntry, state_manager: StateManager
+) -> set[str]:
+    """Bring the loaded devices and scenes in line with the hub, without
+    reloading the entry. Only the lists of devices and scenes are
+    requested, plus the details of devices which are new or changed (eg.
+    renamed). The cached discovery is updated as well.
+
+    The hub answers with empty lists when it fails, so an empty device list
+    (or an empty scene list while there are scenes) aborts the sync. A
+    device is only removed if it is missing from two consecutive syncs.
+
+    Returns the IDs of the devices which were removed from the hub.
+    """
+    manager = state_manager.manager
+    api: RademacherApi = manager.api
+    # Same as the cached discovery, updated by every sync
+    responses = dict(state_manager.discovery)
+    known = {
+        HomePilotDevice.get_did_type_from_json(device)["did"]: device
+        for device in responses.get("devices", ())
+    }
+
+    with api.record_discovery() as fresh:
+        device_list = await state_manager.async_request(
+            PRIORITY_POLL, api.get_devices
+        )
+        scene_list = await state_manager.async_request(
+            PRIORITY_POLL, api.async_get_scenes
+        )
+        if not device_list:
+            raise EmptyCatalogue("The hub returned no devices")
+        if not scene_list and manager.scenes:
+            raise EmptyCatalogue("The hub returned no scenes")
+        dids = set()
+        devices = {}
+        for device_json in device_list:
+            id_type = HomePilotDevice.get_did_type_from_json(device_json)
+            did = id_type["did"]
+            dids.add(did)
+            if did in manager.devices and (
+                did not in known
+                or device_identity(known[did]) == device_identity(device_json)
+            ):
+                continue
+            device = await state_manager.async_request(
+                PRIORITY_POLL, HomePilotManager.async_build_device, api, id_type
+            )
+            if device is not None:
+                # None for types which aren't supported
+                devices[did] = device
+    missing = {did for did in manager.devices if did != "-1" and did not in dids}
+    removed = missing & state_manager.missing_devices
+    state_manager.missing_devices = missing - removed
+    if state_manager.missing_devices:
+        _LOGGER.info(
+            "Devices %s are missing on the hub, they are removed if still "
+            "missing at the next check",
+            state_manager.missing_devices,
+        )
+
+    scenes = {
+        scene["id"]: HomePilotScene(
+            api, scene["id"], scene["name"], scene["description"]
+        )
+        for scene in scene_list
+        if scene["is_manual_executable"] == 1
+    }
+    if {sid: scene.name for sid, scene in scenes.items()} == {
+        sid: scene.name for sid, scene in manager.scenes.items()
+    }:
+        scenes = None
+
+    # Devices which may still come back stay in the cache
+    device_list = fresh["devices"] + [
+        known[did] for did in state_manager.missing_devices if did in known
+    ]
+    # The device list holds states as well, which change all the time.
+    # The cache is only saved when a device or scene changed, to spare
+    # the storage of the system.
+    list_changed = [device_identity(device) for device in device_list] != [
+        device_identity(device) for device in responses.get("devices", ())
+    ]
+    if devices or removed or scenes is not None or list_changed:
+        responses["devices"] = device_list
+        responses["scenes"] = fresh["scenes"]
+        for did in devices:
+            responses[f"device/{did}"] = fresh[f"device/{did}"]
+        for did in removed:
+            responses.pop(f"device/{did}", None)
+        await discovery_store(hass, entry).async_save(responses)
+    state_manager.discovery = responses
+
+    if devices or removed or scenes is not None:
+        await state_manager.async_update_catalogue(devices, removed, scenes)
+    return removed
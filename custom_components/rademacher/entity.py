@@ -1,17 +1,26 @@
 from collections.abc import Mapping
 from typing import Any
-import asyncio
 from contextlib import asynccontextmanager
+import time
 
 from homepilot.device import HomePilotDevice
 
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
 
 from .const import DOMAIN
 from .state_manager import StateManager
 
 
-class HomePilotEntity(CoordinatorEntity):
+class HomePilotEntity(Entity):
+    """Entity of a device, updated with the data of the coordinator.
+
+    Unlike a CoordinatorEntity it is notified of the state changes of its
+    own device only, rather than of every coordinator update.
+    """
+
+    _attr_should_poll = False
+
     def __init__(
         self,
         state_manager: StateManager,
@@ -22,7 +31,7 @@ class HomePilotEntity(CoordinatorEntity):
         entity_category=None,
         icon=None,
     ):
-        super().__init__(state_manager.coordinator)
+        self.coordinator = state_manager.coordinator
         self._state_manager = state_manager
         self._unique_id = unique_id
         self._name = name
@@ -32,6 +41,8 @@ class HomePilotEntity(CoordinatorEntity):
         self._icon = icon
         self._did = device.did
         self._model = device.model
+        # Name and start time of the last command which isn't confirmed yet
+        self._pending_command: tuple[str, float] | None = None
 
     @property
     def state_manager(self):
@@ -95,12 +106,77 @@ class HomePilotEntity(CoordinatorEntity):
         device: HomePilotDevice = self.coordinator.data[self.did]
         return getattr(device, "extra_attributes")
 
+    @callback
+    def async_rename(self, entity: "HomePilotEntity") -> None:
+        """Take over the names of a freshly built entity, eg. after the
+        device was renamed on the hub.
+        """
+        self._name = entity.name
+        self._device_name = entity.device_name
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to state changes of this entity's device."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.state_manager.async_add_listener(
+                self.did, self._handle_coordinator_update
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle a state change of the device."""
+        self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Update the entity.
+
+        Only used by the generic entity update service.
+        """
+        # Ignore manual update requests if the entity is disabled
+        if not self.enabled:
+            return
+        await self.coordinator.async_request_refresh()
+
+    async def async_send_command(self, func, *args):
+        """Send a command to the device. Commands are sent ahead of any
+        queued state queries.
+        """
+        start = time.monotonic()
+        result = await self.state_manager.async_send_command(func, *args)
+        self.state_manager.async_record_command_time(
+            self.did, func.__name__, "accept", time.monotonic() - start
+        )
+        self._pending_command = (func.__name__, start)
+        return result
+
+    @callback
+    def _async_command_confirmed(self) -> None:
+        """The device reported a new state after the last command."""
+        if self._pending_command is not None:
+            command, start = self._pending_command
+            self._pending_command = None
+            self.state_manager.async_record_command_time(
+                self.did, command, "confirm", time.monotonic() - start
+            )
+
+    async def async_send_setpoint(self, key, func, *args):
+        """Send a setpoint command to the device. While the value keeps
+        changing (eg. a slider being dragged) only the latest value is
+        sent. Returns True if this value was sent.
+        """
+        return await self.state_manager.async_send_setpoint(
+            self.did, key, func, *args
+        )
+
     async def async_update_device_state(self):
         """Query the state of this device and update it.
         Should be called after making changes to the device state.
         """
-        await self.state_manager.async_update_device_state(self.did)
-        self.schedule_update_ha_state()
+        if await self.state_manager.async_update_device_state(self.did):
+            self._async_command_confirmed()
 
     @asynccontextmanager
     async def async_state_change_context(self, *, max_wait=5.0):
@@ -110,25 +186,12 @@ class HomePilotEntity(CoordinatorEntity):
         Keeps checking for state updates until the state has changed
         compared to the state before the change.
         """
-        before = self.state_manager.get_last_state(self.did)
+        before = self.state_manager.get_last_state(self.did) or {}
         yield self  # Let the caller perform the state change
-        try:
-            # Keep checking for state updates, up to max_wait seconds
-            async with asyncio.timeout(max_wait):
-                await self._async_state_update_check(before)
-        except asyncio.TimeoutError:
-            pass
-
-    async def _async_state_update_check(self, before):
-        delay = 0.05
-        while True:
-            await self.state_manager.async_update_device_state(self.did)
-            after = self.state_manager.get_last_state(self.did)
-
-            if after["statusesMap"] != before["statusesMap"]:
-                self.schedule_update_ha_state()
-                return
-
-            await asyncio.sleep(delay)
-            # Exponential backoff, up to 1 second
-            delay = min(delay * 2, 1.0)
+        # Keep checking for state updates, up to max_wait seconds
+        if await self.state_manager.async_watch(
+            self.did,
+            lambda after: after.get("statusesMap") != before.get("statusesMap"),
+            max_wait,
+        ):
+            self._async_command_confirmed()
@@ -3,7 +3,6 @@ import logging
 from typing import Any
 
 from homepilot.actuator import HomePilotActuator
-from homepilot.device import HomePilotDevice
 from homepilot.light import HomePilotLight
 
 from homeassistant.components.light import (
@@ -13,7 +12,6 @@ from homeassistant.components.light import (
     ColorMode,
     LightEntity,
 )
-from homeassistant.const import CONF_EXCLUDE
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -25,21 +23,19 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for light platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("light", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the light entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotActuator):
-                _LOGGER.info("Found Actuator/Light for Device ID: %s", device.did)
-                new_entities.append(HomePilotActuatorLightEntity(state_manager, device))
-            if isinstance(device, HomePilotLight):
-                _LOGGER.info("Found Light for Device ID: %s", device.did)
-                new_entities.append(HomePilotLightEntity(state_manager, device))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(HomePilotActuator):
+        _LOGGER.debug("Found Actuator/Light for Device ID: %s", device.did)
+        new_entities.append(HomePilotActuatorLightEntity(state_manager, device))
+    for device in state_manager.get_devices(HomePilotLight):
+        _LOGGER.debug("Found Light for Device ID: %s", device.did)
+        new_entities.append(HomePilotLightEntity(state_manager, device))
+    return new_entities
 
 
 class HomePilotActuatorLightEntity(HomePilotEntity, LightEntity):
@@ -70,15 +66,17 @@ class HomePilotActuatorLightEntity(HomePilotEntity, LightEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         device: HomePilotActuator = self.coordinator.data[self.did]
         if ATTR_BRIGHTNESS in kwargs:
-            await device.async_set_brightness(round(kwargs[ATTR_BRIGHTNESS]*100/255))
+            await self.async_send_command(
+                device.async_set_brightness, round(kwargs[ATTR_BRIGHTNESS]*100/255)
+            )
         else:
-            await device.async_turn_on()
+            await self.async_send_command(device.async_turn_on)
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         device: HomePilotActuator = self.coordinator.data[self.did]
         async with self.async_state_change_context():
-            await device.async_turn_off()
+            await self.async_send_command(device.async_turn_off)
 
 
 class HomePilotLightEntity(HomePilotEntity, LightEntity):
@@ -135,17 +133,21 @@ class HomePilotLightEntity(HomePilotEntity, LightEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         device: HomePilotActuator = self.coordinator.data[self.did]
         if not device.is_on:
-            await device.async_turn_on()
+            await self.async_send_command(device.async_turn_on)
         if ATTR_BRIGHTNESS in kwargs:
-            await device.async_set_brightness(round(kwargs[ATTR_BRIGHTNESS]*100/255))
+            await self.async_send_command(
+                device.async_set_brightness, round(kwargs[ATTR_BRIGHTNESS]*100/255)
+            )
         if ATTR_RGB_COLOR in kwargs:
-            await device.async_set_rgb(*kwargs[ATTR_RGB_COLOR])
+            await self.async_send_command(device.async_set_rgb, *kwargs[ATTR_RGB_COLOR])
         if ATTR_COLOR_TEMP in kwargs:
-            await device.async_set_color_temp(kwargs[ATTR_COLOR_TEMP])
+            await self.async_send_command(
+                device.async_set_color_temp, kwargs[ATTR_COLOR_TEMP]
+            )
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         device: HomePilotActuator = self.coordinator.data[self.did]
         async with self.async_state_change_context():
-            await device.async_turn_off()
+            await self.async_send_command(device.async_turn_off)
 
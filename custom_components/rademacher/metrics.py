@@ -0,0 +1,100 @@
+"""Cheap, constant memory metrics of the communication with the hub."""
+import bisect
+import time
+
+# Upper bounds of the histogram buckets, in seconds
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+# The histograms cover the values of the last one to two windows
+HISTOGRAM_WINDOW = 3600
+
+
+class Histogram:
+    """Rolling histogram of durations with fixed buckets.
+
+    Values are counted in the current window, which replaces the previous
+    one once it is HISTOGRAM_WINDOW seconds old. The counts and the recent
+    maximum cover both, max covers all values.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS, window=HISTOGRAM_WINDOW) -> None:
+        self._buckets = buckets
+        self._window = window
+        # One more bucket for values above the last bound
+        self._current = [0] * (len(buckets) + 1)
+        self._previous = [0] * (len(buckets) + 1)
+        self._current_max = 0.0
+        self._previous_max = 0.0
+        self._window_start = time.monotonic()
+        self.total = 0
+        self.max = 0.0
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start < self._window:
+            return
+        if now - self._window_start < 2 * self._window:
+            self._previous = self._current
+            self._previous_max = self._current_max
+        else:
+            # Nothing was added during the whole previous window
+            self._previous = [0] * len(self._current)
+            self._previous_max = 0.0
+        self._current = [0] * len(self._current)
+        self._current_max = 0.0
+        self._window_start = now
+
+    def add(self, value: float) -> None:
+        self._rotate()
+        self._current[bisect.bisect_left(self._buckets, value)] += 1
+        self.total += 1
+        self._current_max = max(self._current_max, value)
+        self.max = max(self.max, value)
+
+    @property
+    def counts(self) -> list[int]:
+        self._rotate()
+        return [a + b for a, b in zip(self._previous, self._current)]
+
+    @property
+    def recent_max(self) -> float:
+        self._rotate()
+        return max(self._previous_max, self._current_max)
+
+    def percentile(self, percent: float) -> float | None:
+        """Upper bound of the bucket holding the given percentile of the
+        recent values (at most their maximum), None without values.
+        """
+        counts = self.counts
+        recent_max = self.recent_max
+        count = sum(counts)
+        if not count:
+            return None
+        rank = count * percent / 100
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                if index < len(self._buckets):
+                    return min(self._buckets[index], recent_max)
+                break
+        return recent_max
+
+    def as_dict(self) -> dict:
+        """The recent counts per bucket, for diagnostics."""
+        counts = self.counts
+        return {
+            "buckets": {
+                **{
+                    f"<={bound}": counts[index]
+                    for index, bound in enumerate(self._buckets)
+                },
+                f">{self._buckets[-1]}": counts[-1],
+            },
+            "total": self.total,
+            "max": self.max,
+            "recent_max": self.recent_max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
@@ -6,7 +6,7 @@ from homepilot.device import HomePilotDevice
 from homepilot.thermostat import HomePilotThermostat
 
 from homeassistant.components.number import NumberDeviceClass, NumberEntity, NumberMode
-from homeassistant.const import CONF_EXCLUDE, PERCENTAGE, UnitOfTemperature
+from homeassistant.const import PERCENTAGE, UnitOfTemperature
 from homeassistant.helpers.entity import EntityCategory
 
 from .const import DOMAIN
@@ -19,34 +19,32 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for switch platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("number", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the number entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotCover):
-                cover: HomePilotCover = device
-                if cover.has_ventilation_position_config:
-                    _LOGGER.info("Found Ventilation Position Config for Device ID: %s", device.did)
-                    new_entities.append(HomePilotVentilationPositionEntity(state_manager, device))
-            if isinstance(device, HomePilotThermostat):
-                thermostat: HomePilotThermostat = device
-                if thermostat.has_temperature_thresh_cfg[0]:
-                    _LOGGER.info("Found Temperature Threshold Config 1 for Device ID: %s", device.did)
-                    new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 1))
-                if thermostat.has_temperature_thresh_cfg[1]:
-                    _LOGGER.info("Found Temperature Threshold Config 2 for Device ID: %s", device.did)
-                    new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 2))
-                if thermostat.has_temperature_thresh_cfg[2]:
-                    _LOGGER.info("Found Temperature Threshold Config 3 for Device ID: %s", device.did)
-                    new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 3))
-                if thermostat.has_temperature_thresh_cfg[3]:
-                    _LOGGER.info("Found Temperature Threshold Config 4 for Device ID: %s", device.did)
-                    new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 4))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(
+        HomePilotCover, "has_ventilation_position_config"
+    ):
+        _LOGGER.debug("Found Ventilation Position Config for Device ID: %s", device.did)
+        new_entities.append(HomePilotVentilationPositionEntity(state_manager, device))
+    for device in state_manager.get_devices(HomePilotThermostat):
+        thermostat: HomePilotThermostat = device
+        if thermostat.has_temperature_thresh_cfg[0]:
+            _LOGGER.debug("Found Temperature Threshold Config 1 for Device ID: %s", device.did)
+            new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 1))
+        if thermostat.has_temperature_thresh_cfg[1]:
+            _LOGGER.debug("Found Temperature Threshold Config 2 for Device ID: %s", device.did)
+            new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 2))
+        if thermostat.has_temperature_thresh_cfg[2]:
+            _LOGGER.debug("Found Temperature Threshold Config 3 for Device ID: %s", device.did)
+            new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 3))
+        if thermostat.has_temperature_thresh_cfg[3]:
+            _LOGGER.debug("Found Temperature Threshold Config 4 for Device ID: %s", device.did)
+            new_entities.append(HomePilotTemperatureThresholdEntity(state_manager, device, 4))
+    return new_entities
 
 
 class HomePilotVentilationPositionEntity(HomePilotEntity, NumberEntity):
@@ -82,8 +80,10 @@ class HomePilotVentilationPositionEntity(HomePilotEntity, NumberEntity):
     async def async_set_native_value(self, value):
         """Turn the entity on."""
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_set_ventilation_position(value)
-        await self.async_update_device_state()
+        if await self.async_send_setpoint(
+            "ventilation_position", device.async_set_ventilation_position, value
+        ):
+            await self.async_update_device_state()
 
 class HomePilotTemperatureThresholdEntity(HomePilotEntity, NumberEntity):
     """This class represents Cover Ventilation Position."""
@@ -115,5 +115,10 @@ class HomePilotTemperatureThresholdEntity(HomePilotEntity, NumberEntity):
     async def async_set_native_value(self, value):
         """Turn the entity on."""
         device: HomePilotThermostat = self.coordinator.data[self.did]
-        await device.async_set_temperature_thresh_cfg(self._thresh_number, value)
-        await self.async_update_device_state()
+        if await self.async_send_setpoint(
+            f"temperature_thresh_{self._thresh_number}",
+            device.async_set_temperature_thresh_cfg,
+            self._thresh_number,
+            value,
+        ):
+            await self.async_update_device_state()
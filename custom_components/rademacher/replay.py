@@ -0,0 +1,133 @@
+"""Replay a traffic recording for profiling, without the hub and outside
+of the running Home Assistant instance. From the configuration directory:
+
+    python -m custom_components.rademacher.replay rademacher_traffic_....json.gz
+
+The devices and entities are built from the discovery responses and the
+options in the recording, in a separate Home Assistant instance with a
+temporary configuration directory.
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+import importlib
+import json
+import logging
+import tempfile
+
+from homepilot.manager import HomePilotManager
+
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+    floor_registry as fr,
+    label_registry as lr,
+    restore_state,
+    translation,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from . import get_platforms
+from .api import RademacherApi
+from .const import DOMAIN
+from .state_manager import StateManager
+from .traffic import load_traffic
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICE_KEY_PREFIX = "device/"
+
+
+def _replayed_traffic(recording: dict) -> list:
+    """The recorded traffic, plus the discovery responses of the devices
+    whose details weren't requested while recording (eg. because their
+    state never changed). They are requested on the first replayed poll.
+    """
+    traffic = recording["traffic"]
+    requested = {
+        tuple(args) for _start, _duration, name, args, _response, _error in traffic
+        if name == "get_device"
+    }
+    return traffic + [
+        [0, 0, "get_device", [key[len(DEVICE_KEY_PREFIX):]], response, None]
+        for key, response in recording["discovery"].items()
+        if key.startswith(DEVICE_KEY_PREFIX)
+        and (key[len(DEVICE_KEY_PREFIX):],) not in requested
+    ]
+
+
+async def async_replay(hass: HomeAssistant, recording: dict) -> dict:
+    """Build a state manager and its entities from a recording and replay
+    its traffic, see StateManager.async_replay_traffic.
+    """
+    # No request reaches the network, they are all answered by the recording
+    api = RademacherApi("replay", "")
+    with api.replay_discovery(recording["discovery"]):
+        manager = await HomePilotManager.async_build_manager(api)
+    state_manager = StateManager(hass, manager, {}, recording["options"])
+    state_manager.discovery = recording["discovery"]
+    # Entities only listen to the state manager, the coordinator never polls
+    state_manager.coordinator = DataUpdateCoordinator(
+        hass, _LOGGER, name=f"{DOMAIN} replay"
+    )
+    state_manager.coordinator.data = manager.devices
+    traffic = _replayed_traffic(recording)
+    await state_manager.async_replay_first_refresh(traffic)
+
+    for platform in get_platforms(state_manager):
+        module = importlib.import_module(f".{platform}", __package__)
+        entity_platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain=platform,
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        state_manager.async_setup_platform(
+            platform,
+            module.build_entities,
+            lambda entities, entity_platform=entity_platform: hass.async_create_task(
+                entity_platform.async_add_entities(entities)
+            ),
+        )
+    await hass.async_block_till_done()
+    try:
+        return await state_manager.async_replay_traffic(traffic)
+    finally:
+        state_manager.async_shutdown()
+
+
+async def _async_main(recording: dict) -> dict:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entity.async_setup(hass)
+        loader.async_setup(hass)
+        translation.async_setup(hass)
+        await ar.async_load(hass)
+        await fr.async_load(hass)
+        await lr.async_load(hass)
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        await restore_state.async_load(hass)
+        try:
+            return await async_replay(hass, recording)
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="recording written in debug mode")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_async_main(load_traffic(args.recording))), indent=2))
+
+
+if __name__ == "__main__":
+    main()
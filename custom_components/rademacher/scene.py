@@ -5,6 +5,7 @@ from typing import Any
 from homepilot.scenes import HomePilotScene
 
 from homeassistant.components.scene import Scene
+from homeassistant.core import callback
 
 from .const import DOMAIN
 from .state_manager import StateManager
@@ -15,15 +16,18 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for switch platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
+    state_manager.async_setup_platform("scene", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the scene entities of the hub."""
     manager = state_manager.manager
     new_entities = []
     for sid in manager.scenes:
         scene: HomePilotScene = manager.scenes[sid]
-        _LOGGER.info("Found Scene for ID: %s", sid)
-        new_entities.append(HomePilotSceneEntity(sid, scene))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+        _LOGGER.debug("Found Scene for ID: %s", sid)
+        new_entities.append(HomePilotSceneEntity(state_manager, sid, scene))
+    return new_entities
 
 
 class HomePilotSceneEntity(Scene):
@@ -32,8 +36,9 @@ class HomePilotSceneEntity(Scene):
     _scene: HomePilotScene
 
     def __init__(
-        self, sid: str, scene: HomePilotScene
+        self, state_manager: StateManager, sid: str, scene: HomePilotScene
     ) -> None:
+        self._state_manager = state_manager
         self._sid = sid
         self._scene = scene
         self._attr_unique_id = f"scene_{sid}"
@@ -43,6 +48,17 @@ class HomePilotSceneEntity(Scene):
     def available(self):
         return True
 
+    @callback
+    def async_rename(self, entity: "HomePilotSceneEntity") -> None:
+        """Take over the name of a freshly built entity, eg. after the
+        scene was renamed on the hub.
+        """
+        self._attr_name = entity.name
+        if self.hass is not None:
+            self.async_write_ha_state()
+
     async def async_activate(self, **kwargs: Any) -> None:
         """Activate scene. Try to get entities into requested state."""
-        await self._scene.async_execute_scene()
\ No newline at end of file
+        await self._state_manager.async_send_command(
+            self._scene.async_execute_scene
+        )
\ No newline at end of file
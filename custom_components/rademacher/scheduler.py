@@ -0,0 +1,105 @@
+"""Priority scheduling of requests to the Rademacher hub."""
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+
+# Lower value runs first
+PRIORITY_COMMAND = 0
+PRIORITY_READ = 1
+PRIORITY_POLL = 2
+
+
+class HubScheduler:
+    """Limits the number of concurrent requests to the hub.
+
+    When all slots are taken, waiting requests are started in order of
+    priority, so user commands overtake confirmation reads and those
+    overtake background polling.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Requests running or waiting, per priority
+        self._requests = [0] * (PRIORITY_POLL + 1)
+        self._idle_waiters: list[tuple[int, asyncio.Future]] = []
+
+    @property
+    def active(self) -> int:
+        """Number of requests currently running."""
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Wait for a free slot, then hold it while in the context."""
+        self._requests[priority] += 1
+        try:
+            if self._active < self._limit and not self._waiters:
+                self._active += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                waiter = (priority, next(self._sequence), future)
+                heapq.heappush(self._waiters, waiter)
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    if future.done() and not future.cancelled():
+                        # The slot was handed over just before cancellation
+                        self._release()
+                    elif waiter in self._waiters:
+                        # Still queued, unless a release already skipped it
+                        self._waiters.remove(waiter)
+                        heapq.heapify(self._waiters)
+                    raise
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            self._requests[priority] -= 1
+            self._notify_idle()
+
+    def is_idle(self, priority: int) -> bool:
+        """Whether no request of the given or a more important priority
+        is running or waiting.
+        """
+        return not any(self._requests[: priority + 1])
+
+    async def async_wait_idle(self, priority: int) -> None:
+        """Wait until no request of the given or a more important priority
+        is running or waiting.
+        """
+        while not self.is_idle(priority):
+            future = asyncio.get_running_loop().create_future()
+            self._idle_waiters.append((priority, future))
+            await future
+
+    def _notify_idle(self) -> None:
+        waiters = []
+        for priority, future in self._idle_waiters:
+            if future.done():
+                continue
+            if self.is_idle(priority):
+                future.set_result(None)
+            else:
+                waiters.append((priority, future))
+        self._idle_waiters = waiters
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Cancelled, its task removes nothing once it resumes
+                continue
+            self._active += 1
+            future.set_result(None)
+            break
@@ -1,8 +1,9 @@
 """Platform for Rademacher Bridge."""
+from datetime import timedelta
 from enum import Enum
 import logging
 
-from homepilot.device import HomePilotDevice
+from homepilot.hub import HomePilotHub
 from homepilot.sensor import ContactState, HomePilotSensor
 from homepilot.thermostat import HomePilotThermostat
 
@@ -12,15 +13,17 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
-    CONF_EXCLUDE,
     CONF_SENSOR_TYPE,
     DEGREE,
     LIGHT_LUX,
     PERCENTAGE,
     UnitOfSpeed,
     UnitOfTemperature,
+    UnitOfTime,
 )
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.event import async_track_time_interval
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -28,149 +31,166 @@ from .state_manager import StateManager
 
 _LOGGER = logging.getLogger(__name__)
 
+# Interval for refreshing the sensors computed from the metrics of the
+# state manager
+METRICS_REFRESH_INTERVAL = timedelta(seconds=30)
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for sensor platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
-    ternary_contact_sensors: list[str] = state_manager.entry_options[CONF_SENSOR_TYPE]
+    state_manager.async_setup_platform("sensor", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the sensor entities of the devices which aren't excluded."""
+    ternary_contact_sensors = set(state_manager.entry_options[CONF_SENSOR_TYPE])
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotSensor):
-                if device.has_temperature:
-                    _LOGGER.info(
-                        "Found Temperature Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="temp",
-                            name_suffix="Temperature",
-                            value_attr="temperature_value",
-                            device_class=SensorDeviceClass.TEMPERATURE.value,
-                            native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-                        )
-                    )
-                if device.has_target_temperature:
-                    _LOGGER.info(
-                        "Found Target Temperature Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="target_temp",
-                            name_suffix="Target Temperature",
-                            value_attr="target_temperature_value",
-                            device_class=SensorDeviceClass.TEMPERATURE.value,
-                            native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-                        )
-                    )
-                if device.has_wind_speed:
-                    _LOGGER.info(
-                        "Found Wind Speed Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="wind_speed",
-                            name_suffix="Wind Speed",
-                            value_attr="wind_speed_value",
-                            native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
-                            icon="mdi:weather-windy",
-                        )
-                    )
-                if device.has_brightness:
-                    _LOGGER.info(
-                        "Found Brightness Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="brightness",
-                            name_suffix="Brightness",
-                            value_attr="brightness_value",
-                            device_class=SensorDeviceClass.ILLUMINANCE.value,
-                            native_unit_of_measurement=LIGHT_LUX,
-                        )
-                    )
-                if device.has_sun_height:
-                    _LOGGER.info(
-                        "Found Sun Height Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="sun_height",
-                            name_suffix="Sun Height",
-                            value_attr="sun_height_value",
-                            native_unit_of_measurement=DEGREE,
-                            icon="mdi:weather-sunset-up",
-                        )
-                    )
-                if device.has_sun_direction:
-                    _LOGGER.info(
-                        "Found Sun Direction Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="sun_direction",
-                            name_suffix="Sun Direction",
-                            value_attr="sun_direction_value",
-                            native_unit_of_measurement=DEGREE,
-                            icon="mdi:sun-compass",
-                        )
-                    )
-                if device.has_contact_state and device.did in ternary_contact_sensors:
-                    _LOGGER.info("Found Contact Sensor for Device ID: %s", device.did)
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            device_class=SensorDeviceClass.ENUM.value,
-                            id_suffix="contact_state",
-                            name_suffix="Contact State",
-                            value_attr="contact_state_value",
-                            state_class=None,
-                            icon_template=lambda val: "mdi:square-outline"
-                            if val == ContactState.OPEN
-                            else (
-                                "mdi:network-strength-outline"
-                                if val == ContactState.TILTED
-                                else "mdi:square"
-                            ),
-                            options=["Open", "Tilted", "Closed"]
-                        )
-                    )
-            if isinstance(device, (HomePilotSensor, HomePilotThermostat)):
-                if device.has_battery_level:
-                    _LOGGER.info(
-                        "Found Battery Level Sensor for Device ID: %s", device.did
-                    )
-                    new_entities.append(
-                        HomePilotSensorEntity(
-                            state_manager=state_manager,
-                            device=device,
-                            id_suffix="battery_level",
-                            name_suffix="Battery Level",
-                            value_attr="battery_level_value",
-                            device_class=SensorDeviceClass.BATTERY,
-                            native_unit_of_measurement=PERCENTAGE,
-                            entity_category=EntityCategory.DIAGNOSTIC,
-                        )
+    for device in state_manager.get_devices(HomePilotSensor):
+        if device.has_temperature:
+            _LOGGER.debug(
+                "Found Temperature Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="temp",
+                    name_suffix="Temperature",
+                    value_attr="temperature_value",
+                    device_class=SensorDeviceClass.TEMPERATURE.value,
+                    native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+                )
+            )
+        if device.has_target_temperature:
+            _LOGGER.debug(
+                "Found Target Temperature Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="target_temp",
+                    name_suffix="Target Temperature",
+                    value_attr="target_temperature_value",
+                    device_class=SensorDeviceClass.TEMPERATURE.value,
+                    native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+                )
+            )
+        if device.has_wind_speed:
+            _LOGGER.debug(
+                "Found Wind Speed Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="wind_speed",
+                    name_suffix="Wind Speed",
+                    value_attr="wind_speed_value",
+                    native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+                    icon="mdi:weather-windy",
+                )
+            )
+        if device.has_brightness:
+            _LOGGER.debug(
+                "Found Brightness Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="brightness",
+                    name_suffix="Brightness",
+                    value_attr="brightness_value",
+                    device_class=SensorDeviceClass.ILLUMINANCE.value,
+                    native_unit_of_measurement=LIGHT_LUX,
+                )
+            )
+        if device.has_sun_height:
+            _LOGGER.debug(
+                "Found Sun Height Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="sun_height",
+                    name_suffix="Sun Height",
+                    value_attr="sun_height_value",
+                    native_unit_of_measurement=DEGREE,
+                    icon="mdi:weather-sunset-up",
+                )
+            )
+        if device.has_sun_direction:
+            _LOGGER.debug(
+                "Found Sun Direction Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="sun_direction",
+                    name_suffix="Sun Direction",
+                    value_attr="sun_direction_value",
+                    native_unit_of_measurement=DEGREE,
+                    icon="mdi:sun-compass",
+                )
+            )
+        if device.has_contact_state and device.did in ternary_contact_sensors:
+            _LOGGER.debug("Found Contact Sensor for Device ID: %s", device.did)
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    device_class=SensorDeviceClass.ENUM.value,
+                    id_suffix="contact_state",
+                    name_suffix="Contact State",
+                    value_attr="contact_state_value",
+                    state_class=None,
+                    icon_template=lambda val: "mdi:square-outline"
+                    if val == ContactState.OPEN
+                    else (
+                        "mdi:network-strength-outline"
+                        if val == ContactState.TILTED
+                        else "mdi:square"
+                    ),
+                    options=["Open", "Tilted", "Closed"]
+                )
+            )
+    for device in state_manager.get_devices((HomePilotSensor, HomePilotThermostat)):
+        if device.has_battery_level:
+            _LOGGER.debug(
+                "Found Battery Level Sensor for Device ID: %s", device.did
+            )
+            new_entities.append(
+                HomePilotSensorEntity(
+                    state_manager=state_manager,
+                    device=device,
+                    id_suffix="battery_level",
+                    name_suffix="Battery Level",
+                    value_attr="battery_level_value",
+                    device_class=SensorDeviceClass.BATTERY,
+                    native_unit_of_measurement=PERCENTAGE,
+                    entity_category=EntityCategory.DIAGNOSTIC,
+                )
+            )
+    for device in state_manager.get_devices(HomePilotHub):
+        for metric, name in (
+            ("accept", "Command Accept Time"),
+            ("confirm", "Command Confirmation Time"),
+        ):
+            for percentile in (50, 95):
+                new_entities.append(
+                    HomePilotCommandTimeSensorEntity(
+                        state_manager=state_manager,
+                        device=device,
+                        metric=metric,
+                        percentile=percentile,
+                        name_suffix=f"{name} p{percentile}",
                     )
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+                )
+    return new_entities
 
 
 class HomePilotSensorEntity(HomePilotEntity, SensorEntity):
@@ -225,3 +245,62 @@ class HomePilotSensorEntity(HomePilotEntity, SensorEntity):
                 getattr(self.coordinator.data[self.did], self.value_attr)
             )
         return super().icon
+
+
+class HomePilotCommandTimeSensorEntity(HomePilotEntity, SensorEntity):
+    """This class represents a percentile of the time commands took until
+    they were accepted by the hub, or until the device reported its new
+    state, over all devices.
+    """
+
+    def __init__(
+        self,
+        state_manager: StateManager,
+        device: HomePilotHub,
+        metric,
+        percentile,
+        name_suffix,
+    ) -> None:
+        super().__init__(
+            state_manager,
+            device,
+            unique_id=f"{device.uid}_command_{metric}_p{percentile}",
+            name=f"{device.name} {name_suffix}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+        )
+        self._metric = metric
+        self._percentile = percentile
+        self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_suggested_display_precision = 2
+
+    @property
+    def entity_registry_enabled_default(self):
+        return False
+
+    @property
+    def available(self):
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        """The value isn't part of any device state, it is refreshed on
+        its own timer. Unlike polling by the platform, the timer only runs
+        while the entity is enabled.
+        """
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_refresh, METRICS_REFRESH_INTERVAL
+            )
+        )
+
+    @callback
+    def _async_refresh(self, _now) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        return self.state_manager.command_times[self._metric].percentile(
+            self._percentile
+        )
@@ -1,19 +1,104 @@
 import asyncio
+import copy
 from datetime import timedelta
 import logging
 import time
+import tracemalloc
 
-from homepilot.api import AuthError
+from homepilot.api import AuthError, CannotConnect
+from homepilot.cover import HomePilotCover
 from homepilot.manager import HomePilotManager
 from homepilot.device import HomePilotDevice
+from homepilot.thermostat import HomePilotThermostat
+from homepilot.wallcontroller import HomePilotWallController
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EXCLUDE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+from .metrics import Histogram
+from .scheduler import PRIORITY_COMMAND, PRIORITY_POLL, PRIORITY_READ, HubScheduler
+from .traffic import append_traffic, start_traffic, traffic_path
 
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds after a command or a cover movement during which we keep
+# polling at the fast interval
+ACTIVITY_WINDOW = 30
+# Number of consecutive polls without any change before we switch
+# to the slow interval
+IDLE_CYCLES = 6
+# Unchanged states are re-applied after this many seconds anyway. Some devices
+# read additional data from the hub while applying their state (eg. blocking
+# detection of covers) which isn't part of the state payload.
+UNCHANGED_STATE_MAX_AGE = 60
+# Maximum number of device states applied at the same time
+MAX_CONCURRENT_APPLY = 8
+# Devices which query the hub while applying their state, for values which
+# aren't part of the state (eg. blocking detection of covers). These
+# queries go through the scheduler like all other requests.
+QUERYING_DEVICE_CLASSES = (HomePilotCover, HomePilotThermostat)
+# Seconds without a new value before a setpoint command is sent
+SETPOINT_QUIET_PERIOD = 0.5
+STORAGE_VERSION = 1
+# Seconds to wait before saving changed device states, more changes in
+# the meantime are saved together
+STATES_SAVE_DELAY = 60
+# Interval for querying the hub state (firmware, updates, LED), which
+# rarely changes. It is queried separately from the device states.
+HUB_POLL_INTERVAL = timedelta(minutes=5)
+# While a firmware update is installed the hub state is polled at the fast
+# interval, for at most this many seconds. Polling stops early if the update
+# hasn't started after FIRMWARE_UPDATE_START_WAIT seconds.
+FIRMWARE_UPDATE_TIMEOUT = 1800
+FIRMWARE_UPDATE_START_WAIT = 60
+# Interval for querying the channels (button presses) of wall controllers
+CHANNEL_POLL_INTERVAL = timedelta(milliseconds=500)
+# Maximum number of requests made to the hub at the same time
+MAX_CONCURRENT_REQUESTS = 4
+# Seconds a poll is deferred at most while commands are being sent, it
+# runs anyway afterwards
+MAX_POLL_DEFER = 5
+# Seconds a command may take, including the wait for a free slot
+COMMAND_TIMEOUT = 10
+# Seconds to wait for more single device reads before querying the hub
+READ_COALESCE_WINDOW = 0.1
+# Above this number of devices one bulk request is used for reading the
+# states of devices instead of one request per device. The bulk request
+# is made of three requests (actuators, sensors and transmitters).
+BULK_READ_THRESHOLD = 3
+# Delay between the polls of watched devices, in seconds. Starts at the
+# minimum and doubles with every poll, up to the maximum.
+WATCH_MIN_DELAY = 0.05
+WATCH_MAX_DELAY = 1.0
+# Limits of a traffic recording, in seconds and bytes (before compression).
+# No new recording is started until debug logging was disabled in between.
+TRAFFIC_MAX_DURATION = 3600
+TRAFFIC_MAX_SIZE = 50_000_000
+
+
+def states_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Store holding the last known device states of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.states")
+
 
 class StateManager:
     """Manages the states of all devices and provides
@@ -24,18 +109,280 @@ class StateManager:
         hass: HomeAssistant,
         manager: HomePilotManager,
         entry_data: dict,
-        entry_options: dict
+        entry_options: dict,
+        store: Store | None = None,
     ):
         self.hass = hass
         self.manager = manager
         self.entry_data = entry_data
         self.entry_options = entry_options
         self.coordinator = None
-        self._update_in_progress = False
+        # Platforms set up for this entry, and how long the setup took
+        self.platforms: list[str] = []
+        self.setup_timings: dict[str, float] = {}
+        # Measurements of the last poll, see _async_update_states_of_all_devices
+        self.last_poll: dict[str, float] = {}
+        # Number of entity updates caused by state changes since setup
+        self.state_writes = 0
+        # Metrics for diagnostics, see diagnostics.py
+        self.poll_durations = Histogram()
+        # Function (endpoint) -> round trip times of requests to the hub
+        self.request_times: dict[str, Histogram] = {}
+        # Where a timeout occurred ("poll", "hub", "read", "channels",
+        # "command") -> count
+        self.timeouts: dict[str, int] = {}
+        # Number of times a device became available or unavailable
+        self.availability_flips = 0
+        # Times until commands were accepted by the hub ("accept") and until
+        # the device reported the new state ("confirm"), for all commands
+        # and per (device, command)
+        self.command_times = {"accept": Histogram(), "confirm": Histogram()}
+        self.device_command_times: dict[tuple[str, str], dict[str, Histogram]] = {}
+        # Discovery responses the devices were built from
+        self.discovery: dict = {}
+        # Devices missing from the device list of the hub at the last
+        # catalogue sync, they are removed if still missing at the next one
+        self.missing_devices: set[str] = set()
+        self._store = store
+        self._save_pending = False
+        self.excluded_devices: set[str] = set()
+        self._devices_by_class: dict[type, list[HomePilotDevice]] = {}
+        self._devices_by_capability: dict[str, list[HomePilotDevice]] = {}
+        # Platform -> (build_entities, async_add_entities)
+        self._platform_builders: dict[str, tuple] = {}
+        # Platform -> unique ID -> entity
+        self._platform_entities: dict[str, dict[str, Entity]] = {}
+        self.build_device_index()
+        self._update_task: asyncio.Task | None = None
+        self._pending_reads: dict[str, asyncio.Future] = {}
+        self._unsub_read_flush = None
+        self._setpoints: dict[tuple[str, str], dict] = {}
+        self._watches: dict[str, list] = {}
+        self._watch_task: asyncio.Task | None = None
+        self._watch_delay = WATCH_MIN_DELAY
         self._states = {}
+        # Device ID -> timestamp of the state last applied to the device
+        self._applied_ts: dict[str, float] = {}
+        self._apply_semaphore = asyncio.Semaphore(MAX_CONCURRENT_APPLY)
+        self.scheduler = HubScheduler(MAX_CONCURRENT_REQUESTS)
+        self._listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._changed_devices = set()
+        self._last_activity = 0.0
+        self._idle_cycles = 0
+        self._unsub_activity_refresh = None
+        self._unsub_coordinator = None
+        self._unsub_hub_poll = None
+        self._firmware_update_task: asyncio.Task | None = None
+        # Path, start, size and last write of the current traffic recording
+        self._traffic_recording: dict | None = None
+        self._traffic_limit_reached = False
+        self._unsub_channel_poll = None
+        self._channel_poll_running = False
+        self._synced_channels: set[str] = set()
+
+    def build_device_index(self):
+        """Index the devices which aren't excluded by class and by their
+        capability flags (the has_* properties), so that platforms only
+        look at the devices they need.
+        """
+        self.excluded_devices = set(self.entry_options.get(CONF_EXCLUDE, ()))
+        self._devices_by_class = {}
+        self._devices_by_capability = {}
+        for did, device in self.manager.devices.items():
+            if did in self.excluded_devices:
+                continue
+            for device_class in type(device).__mro__:
+                self._devices_by_class.setdefault(device_class, []).append(device)
+            for name in dir(type(device)):
+                if not name.startswith("has_"):
+                    continue
+                try:
+                    value = getattr(device, name)
+                except AttributeError:
+                    continue
+                if value is True:
+                    self._devices_by_capability.setdefault(name, []).append(device)
+
+    def get_devices(
+        self, device_class=HomePilotDevice, capability=None
+    ) -> list[HomePilotDevice]:
+        """Devices which aren't excluded, of the given class (or tuple of
+        classes) and optionally with the given capability flag, eg.
+        "has_ping_cmd".
+        """
+        if capability is not None:
+            return [
+                device
+                for device in self._devices_by_capability.get(capability, ())
+                if isinstance(device, device_class)
+            ]
+        if isinstance(device_class, tuple):
+            return [
+                device
+                for device in self._devices_by_class.get(HomePilotDevice, ())
+                if isinstance(device, device_class)
+            ]
+        return list(self._devices_by_class.get(device_class, ()))
+
+    @callback
+    def async_setup_platform(self, platform, build_entities, async_add_entities):
+        """Add the entities of a platform. build_entities(state_manager)
+        is kept to add or remove entities when the options change.
+        """
+        self._platform_builders[platform] = (build_entities, async_add_entities)
+        self._async_sync_platform_entities(platform)
+
+    @callback
+    def _async_sync_platform_entities(self, platform):
+        """Add the entities of a platform which don't exist yet, and remove
+        those which aren't built anymore. Existing entities whose name
+        changed (eg. the device was renamed) are renamed.
+        """
+        build_entities, async_add_entities = self._platform_builders[platform]
+        entities = {entity.unique_id: entity for entity in build_entities(self)}
+        current = self._platform_entities.get(platform, {})
+        self._platform_entities[platform] = {
+            unique_id: current.get(unique_id, entity)
+            for unique_id, entity in entities.items()
+        }
+
+        new_entities = [
+            entity for unique_id, entity in entities.items() if unique_id not in current
+        ]
+        if new_entities:
+            async_add_entities(new_entities)
+        for unique_id in current.keys() & entities.keys():
+            if current[unique_id].name != entities[unique_id].name:
+                current[unique_id].async_rename(entities[unique_id])
+
+        entity_registry = er.async_get(self.hass)
+        for unique_id in current.keys() - entities.keys():
+            entity_id = entity_registry.async_get_entity_id(platform, DOMAIN, unique_id)
+            if entity_id is not None:
+                _LOGGER.info("Removing entity %s", entity_id)
+                # Removes the entity from HA as well
+                entity_registry.async_remove(entity_id)
+
+    @callback
+    def async_update_options(self, entry_options: dict):
+        """Apply changed options without reloading: entities of newly
+        excluded devices are removed, those of included devices added.
+        """
+        self.entry_options = entry_options
+        self.build_device_index()
+        for platform in self._platform_builders:
+            self._async_sync_platform_entities(platform)
+        if self.coordinator is not None:
+            # Polling intervals may have changed
+            self._async_schedule_next_update()
+
+    async def async_update_catalogue(
+        self,
+        devices: dict[str, HomePilotDevice],
+        removed: set[str],
+        scenes: dict | None = None,
+    ):
+        """Apply changes of the devices and scenes on the hub without
+        reloading: devices holds new devices and rebuilt ones which
+        changed (eg. were renamed), removed the IDs of deleted devices and
+        scenes, if given, replaces the scenes of the manager.
+
+        The states of new and rebuilt devices are read before their
+        entities are added or renamed.
+        """
+        device_registry = dr.async_get(self.hass)
+        for did, device in devices.items():
+            previous = self.manager.devices.get(did)
+            if previous is None:
+                _LOGGER.info("Found new device %s on the hub", did)
+            elif previous.name != device.name:
+                _LOGGER.info(
+                    "Device %s was renamed from %s to %s", did, previous.name, device.name
+                )
+                device_entry = device_registry.async_get_device({(DOMAIN, did)})
+                if device_entry is not None:
+                    device_registry.async_update_device(
+                        device_entry.id, name=device.name
+                    )
+            device.available = False
+            self.manager.devices[did] = device
+            self._applied_ts.pop(did, None)
+            self._synced_channels.discard(did)
+        await asyncio.gather(
+            *(self.async_update_device_state(did) for did in devices),
+            return_exceptions=True,
+        )
 
-    async def build_update_coordinator(self):
-        """Build the update coordinator and do the first refresh."""
+        # Removed devices are dropped together with their entities, without
+        # awaiting in between: entities read their device from the manager
+        for did in removed:
+            _LOGGER.info("Device %s was removed from the hub", did)
+            self.manager.devices.pop(did, None)
+            self._states.pop(did, None)
+            self._applied_ts.pop(did, None)
+            self._synced_channels.discard(did)
+        if scenes is not None:
+            self.manager.scenes = scenes
+        self.build_device_index()
+        for platform in self._platform_builders:
+            self._async_sync_platform_entities(platform)
+        self._async_start_channel_poll()
+
+    async def async_restore_states(self, discovery: dict) -> bool:
+        """Apply the device states saved before the last shutdown, so
+        entities have a state before the hub is queried. Requests made
+        while applying them are answered from the discovery responses.
+
+        Returns True if any state was restored.
+        """
+        self.discovery = discovery
+        if self._store is None:
+            return False
+        states = await self._store.async_load() or {}
+        restored = False
+        with self.manager.api.replay_discovery(discovery):
+            for did, device in self.manager.devices.items():
+                state = states.get(did)
+                if state is None:
+                    device.available = False
+                    continue
+                try:
+                    await self._async_apply_device_state(
+                        did, state, state.pop("_ts", 0.0)
+                    )
+                except Exception as err:
+                    _LOGGER.debug("Cannot restore the state of device %s: %s", did, err)
+                    self._mark_unavailable(did)
+                else:
+                    restored = True
+        return restored
+
+    @callback
+    def _async_schedule_save(self):
+        if self._store is not None:
+            self._save_pending = True
+            self._store.async_delay_save(self._states_to_save, STATES_SAVE_DELAY)
+
+    def _states_to_save(self):
+        self._save_pending = False
+        return self._states
+
+    async def async_close_store(self):
+        """Save the device states right away instead of after
+        STATES_SAVE_DELAY, and stop saving them. Called when the entry is
+        unloaded, so no save is left pending which could overwrite the
+        states loaded after a reload, or recreate the file of a removed
+        entry.
+        """
+        store, self._store = self._store, None
+        if store is not None and self._save_pending:
+            # Also cancels the pending delayed save
+            await store.async_save(self._states)
+
+    async def build_update_coordinator(self, restored: bool = False):
+        """Build the update coordinator and do the first refresh. With
+        restored states the first refresh is done in the background.
+        """
         async def update_method():
             await self._async_update_data()
             return self.manager.devices
@@ -47,71 +394,961 @@ class StateManager:
             name="rademacher",
             update_method=update_method,
             # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=10),
+            # Adjusted after every update, see _async_schedule_next_update.
+            update_interval=timedelta(seconds=DEFAULT_POLL_INTERVAL),
+        )
+        # Entities subscribe to their device through async_add_listener,
+        # this is the only listener of the coordinator itself.
+        self._unsub_coordinator = self.coordinator.async_add_listener(
+            self._async_handle_coordinator_update
         )
 
-        await self.coordinator.async_config_entry_first_refresh()
+        if restored:
+            # Entities use the restored states until the first refresh
+            self.coordinator.data = self.manager.devices
+            self.hass.async_create_background_task(
+                self.coordinator.async_refresh(), "rademacher first refresh"
+            )
+            self.hass.async_create_background_task(
+                self._async_poll_hub(), "rademacher first hub refresh"
+            )
+        else:
+            async def first_hub_refresh():
+                try:
+                    await self._async_update_hub_state()
+                except AuthError as err:
+                    raise ConfigEntryAuthFailed from err
+
+            results = await asyncio.gather(
+                first_hub_refresh(),
+                self.coordinator.async_config_entry_first_refresh(),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    # The other refresh may have scheduled the next one
+                    self.async_shutdown()
+                    await self.async_close_store()
+                    raise result
+
+        self._unsub_hub_poll = async_track_time_interval(
+            self.hass, self._async_poll_hub, HUB_POLL_INTERVAL
+        )
+        self._async_start_channel_poll()
+
+    async def _async_poll_hub(self, _now=None):
+        """Query the state of the hub, independent of the coordinator which
+        polls the device states.
+        """
+        try:
+            await self._async_update_hub_state()
+        except AuthError:
+            # Same as the coordinator does for the device states
+            _LOGGER.warning("Authentication failed while fetching hub state")
+            if self.coordinator.config_entry is not None:
+                self.coordinator.config_entry.async_start_reauth(self.hass)
+
+    async def _async_update_hub_state(self):
+        """Query and apply the state of the hub. Errors mark the hub
+        unavailable, except AuthError which is raised.
+        """
+        ts = time.time()
+        try:
+            async with asyncio.timeout(10):
+                state = await self._async_get_hub_state()
+            changed = await self._async_apply_device_state("-1", state, ts)
+        except asyncio.TimeoutError:
+            self._count_timeout("hub")
+            _LOGGER.warning("Timeout fetching hub state")
+            changed = self._mark_unavailable("-1")
+        except (Exception, CannotConnect) as err:
+            _LOGGER.warning("Error fetching hub state: %s", err)
+            changed = self._mark_unavailable("-1")
+        if changed:
+            self._async_dispatch(["-1"])
+
+    @callback
+    def async_track_firmware_update(self):
+        """Poll the hub state at the fast interval while a firmware update
+        is installed, so its progress is shown.
+        """
+        if self._firmware_update_task is None:
+            self._firmware_update_task = self.hass.async_create_background_task(
+                self._async_poll_firmware_update(), "rademacher firmware update"
+            )
+
+    async def _async_poll_firmware_update(self):
+        hub = self.manager.devices["-1"]
+        start = time.monotonic()
+        started = False
+        try:
+            while time.monotonic() - start < FIRMWARE_UPDATE_TIMEOUT:
+                await asyncio.sleep(self.fast_poll_interval.total_seconds())
+                await self._async_poll_hub()
+                if (
+                    not getattr(hub, "available", False)
+                    or getattr(hub, "download_progress", False) is not False
+                ):
+                    # Installing, or restarting to finish the installation
+                    started = True
+                elif started or time.monotonic() - start > FIRMWARE_UPDATE_START_WAIT:
+                    break
+        finally:
+            self._firmware_update_task = None
+
+    @callback
+    def _async_start_channel_poll(self):
+        """Start querying the channels of wall controllers, if there are
+        any and it isn't running yet.
+        """
+        if self._unsub_channel_poll is None and any(
+            isinstance(device, HomePilotWallController)
+            for device in self.manager.devices.values()
+        ):
+            self._unsub_channel_poll = async_track_time_interval(
+                self.hass, self._async_poll_channels, CHANNEL_POLL_INTERVAL
+            )
+
+    async def _async_poll_channels(self, _now=None):
+        """Query the channels of all wall controllers, independent of the
+        coordinator. Only controllers with a changed channel are notified.
+        """
+        if self._channel_poll_running:
+            # Previous poll still in flight, skip this one
+            return
+        # Controllers without listeners are excluded or have no entities
+        dids = [
+            did
+            for did, device in self.manager.devices.items()
+            if isinstance(device, HomePilotWallController)
+            and device.channels
+            and did in self._listeners
+        ]
+        if not dids:
+            return
+        self._channel_poll_running = True
+        try:
+            async with asyncio.timeout(5):
+                results = await asyncio.gather(
+                    *(self._async_update_channels(did) for did in dids),
+                    return_exceptions=True,
+                )
+        except asyncio.TimeoutError:
+            self._count_timeout("channels")
+            _LOGGER.debug("Timeout querying the channels of wall controllers")
+            return
+        finally:
+            self._channel_poll_running = False
+
+        changed = []
+        for did, result in zip(dids, results):
+            if isinstance(result, BaseException):
+                _LOGGER.debug(
+                    "Error querying the channels of device %s: %s", did, result
+                )
+            elif result:
+                changed.append(did)
+        self._async_dispatch(changed)
+
+    async def _async_update_channels(self, did):
+        """Query the channels of a wall controller. Returns True if any
+        of them changed.
+        """
+        device: HomePilotWallController = self.manager.devices[did]
+        before = {
+            channel: getattr(device, f"channel_{channel}")
+            for channel in device.channels
+        }
+        await self.async_request(PRIORITY_READ, device.update_channels)
+        if did not in self._synced_channels:
+            # The first query only syncs the channel timestamps, which may be
+            # outdated (eg. when discovery came from the cache). Differences
+            # are not button presses.
+            self._synced_channels.add(did)
+            for channel in device.channels:
+                setattr(device, f"channel_{channel}", False)
+        return any(
+            getattr(device, f"channel_{channel}") != value
+            for channel, value in before.items()
+        )
 
     async def _async_update_data(self):
-        if self._update_in_progress:
+        """Update the states of all devices.
+
+        Concurrent callers share the update that is already in flight
+        instead of starting a new one, so all of them get fresh data.
+        """
+        if self._update_task is None:
+            self._update_task = self.hass.async_create_task(
+                self._async_update_data_once()
+            )
+            self._update_task.add_done_callback(self._async_update_task_done)
+        # A cancelled caller must not cancel the update for the others
+        await asyncio.shield(self._update_task)
+
+    @callback
+    def _async_update_task_done(self, task: asyncio.Task):
+        self._update_task = None
+        if not task.cancelled():
+            # Mark the exception as retrieved in case no caller awaits it
+            task.exception()
+
+    @callback
+    def _async_check_traffic_recording(self):
+        """Record the traffic with the hub to a file while debug logging is
+        enabled. The requests are appended once per poll cycle. Recordings
+        are limited to TRAFFIC_MAX_DURATION and TRAFFIC_MAX_SIZE, and can
+        be replayed with replay.py.
+        """
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        recording = self._traffic_recording
+        if recording is None:
+            if not debug:
+                self._traffic_limit_reached = False
+            elif not self._traffic_limit_reached:
+                self._async_start_traffic_recording()
             return
+        self._async_append_traffic(self.manager.api.take_traffic())
+        if (
+            time.monotonic() - recording["start"] >= TRAFFIC_MAX_DURATION
+            or recording["size"] >= TRAFFIC_MAX_SIZE
+        ):
+            _LOGGER.debug("Traffic recording limit reached")
+            self._traffic_limit_reached = True
+            self._async_stop_traffic_recording()
+        elif not debug:
+            self._async_stop_traffic_recording()
+
+    @callback
+    def _async_start_traffic_recording(self):
+        path = traffic_path(self.hass, self.manager.devices["-1"].uid)
+        _LOGGER.debug("Recording the traffic with the hub to %s", path)
+        self._traffic_recording = {
+            "path": path,
+            "start": time.monotonic(),
+            "size": 0,
+            "write": None,
+        }
+        self.manager.api.start_traffic_recording()
+        self._async_write_traffic(
+            start_traffic, path, self.discovery, self.entry_options
+        )
+
+    @callback
+    def _async_stop_traffic_recording(self):
+        recording = self._traffic_recording
+        self._async_append_traffic(self.manager.api.stop_traffic_recording())
+        self._traffic_recording = None
+        _LOGGER.info("Recorded the traffic with the hub to %s", recording["path"])
+
+    @callback
+    def _async_append_traffic(self, records: list):
+        if records:
+            self._async_write_traffic(
+                append_traffic, self._traffic_recording["path"], records
+            )
+
+    @callback
+    def _async_write_traffic(self, func, path, *args):
+        """Write to the current recording in the executor, after the
+        previous write finished.
+        """
+        recording = self._traffic_recording
+        previous = recording["write"]
+
+        async def write():
+            if previous is not None:
+                await previous
+            try:
+                recording["size"] += await self.hass.async_add_executor_job(
+                    func, path, *args
+                )
+            except OSError as err:
+                _LOGGER.warning("Cannot write the traffic recording %s: %s", path, err)
 
-        self._update_in_progress = True
+        recording["write"] = self.hass.async_create_task(write())
+
+    async def async_replay_first_refresh(self, traffic: list):
+        """Apply the first recorded states of the devices and the hub,
+        like the first refresh during setup, before the entities are added.
+        """
+        with self.manager.api.replay_traffic(traffic):
+            try:
+                await asyncio.gather(
+                    self._async_update_hub_state(),
+                    self._async_update_states_of_all_devices(),
+                )
+            except UpdateFailed:
+                pass
+        self._changed_devices.clear()
+
+    async def async_replay_traffic(self, traffic: list) -> dict:
+        """Feed recorded traffic through the poll cycle and the entities
+        as fast as possible, one cycle per recorded poll. For profiling
+        the work done by the integration itself, without a hub. Meant for
+        a state manager built from the recording, see replay.py.
+
+        Returns the number of cycles, the wall and CPU time they took, the
+        peak memory allocated and the number of entity state writes.
+        """
+        cycles = sum(1 for record in traffic if record[2] == "async_get_devices_state")
+        state_writes = self.state_writes
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        allocated, _ = tracemalloc.get_traced_memory()
+        start = time.monotonic()
+        cpu_start = time.process_time()
+        try:
+            with self.manager.api.replay_traffic(traffic):
+                for _ in range(cycles):
+                    try:
+                        await self._async_update_states_of_all_devices()
+                    except UpdateFailed:
+                        pass
+                    self._async_handle_coordinator_update()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        return {
+            "cycles": cycles,
+            "duration": time.monotonic() - start,
+            "cpu": time.process_time() - cpu_start,
+            "allocated_peak": peak - allocated,
+            "state_writes": self.state_writes - state_writes,
+        }
+
+    async def _async_update_data_once(self):
+        self._async_check_traffic_recording()
+        # Defer the poll while commands are being sent. It would slow them
+        # down and its result would be outdated right away.
+        try:
+            async with asyncio.timeout(MAX_POLL_DEFER):
+                await self.scheduler.async_wait_idle(PRIORITY_COMMAND)
+        except asyncio.TimeoutError:
+            _LOGGER.debug(
+                "Commands still being sent after %s s, polling anyway", MAX_POLL_DEFER
+            )
         try:
             # Note: asyncio.TimeoutError and aiohttp.ClientError are already
             # handled by the data update coordinator.
             async with asyncio.timeout(10):
-                await self._async_update_states_of_all_devices()
+                changed = await self._async_update_states_of_all_devices()
+        except asyncio.TimeoutError:
+            self._count_timeout("poll")
+            raise
         except AuthError as err:
             # Raising ConfigEntryAuthFailed will cancel future updates
             # and start a config flow with SOURCE_REAUTH (async_step_reauth)
             raise ConfigEntryAuthFailed from err
-        finally:
-            self._update_in_progress = False
 
-    async def _async_apply_device_state(self, did, state, ts):
-        if ts < self._states.get(did, { "_ts": 0.0 })["_ts"]:
-            # Superseded by a more recent state
+        self._idle_cycles = 0 if changed else self._idle_cycles + 1
+        self._async_schedule_next_update()
+
+    @callback
+    def async_add_listener(self, did, update_callback) -> CALLBACK_TYPE:
+        """Listen for state changes of a device. Returns a function
+        which removes the listener.
+        """
+        listeners = self._listeners.setdefault(did, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._listeners[did]
+
+        return remove_listener
+
+    @callback
+    def _async_dispatch(self, dids) -> int:
+        """Notify the listeners of the given devices. Returns the number
+        of listeners notified.
+        """
+        if dids:
+            self._async_schedule_save()
+        notified = 0
+        for did in dids:
+            for update_callback in list(self._listeners.get(did, ())):
+                update_callback()
+                notified += 1
+        self.state_writes += notified
+        return notified
+
+    @callback
+    def _async_handle_coordinator_update(self):
+        # Entity availability follows the availability of its device, which
+        # is part of the device changes, so failed updates need no special
+        # treatment here.
+        dids = self._changed_devices
+        self._changed_devices = set()
+        self.last_poll["state_writes"] = self._async_dispatch(dids)
+
+    @property
+    def fast_poll_interval(self) -> timedelta:
+        return timedelta(seconds=self.entry_options.get(
+            CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL
+        ))
+
+    @property
+    def slow_poll_interval(self) -> timedelta:
+        return timedelta(seconds=self.entry_options.get(
+            CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL
+        ))
+
+    @callback
+    def _async_schedule_next_update(self):
+        """Pick the polling interval for the next coordinator update.
+
+        Polls fast while something is happening (recent command or a cover
+        moving), slow once nothing has changed for IDLE_CYCLES polls and at
+        the default interval otherwise.
+        """
+        if time.monotonic() - self._last_activity < ACTIVITY_WINDOW:
+            interval = self.fast_poll_interval
+        elif self._idle_cycles >= IDLE_CYCLES:
+            interval = self.slow_poll_interval
+        else:
+            interval = timedelta(seconds=DEFAULT_POLL_INTERVAL)
+        if interval != self.coordinator.update_interval:
+            _LOGGER.debug("Polling interval changed to %s", interval)
+            self.coordinator.update_interval = interval
+
+    @callback
+    def async_mark_activity(self):
+        """Switch to fast polling, eg. after a command has been sent.
+
+        The refresh already scheduled by the coordinator may be up to the
+        slow interval away, so a refresh is requested after the fast
+        interval instead of waiting for it.
+        """
+        self._last_activity = time.monotonic()
+        self._idle_cycles = 0
+        if (
+            self.coordinator is None
+            or self.coordinator.update_interval == self.fast_poll_interval
+            or self._unsub_activity_refresh is not None
+        ):
             return
+        self.coordinator.update_interval = self.fast_poll_interval
+
+        @callback
+        def request_refresh(_now):
+            self._unsub_activity_refresh = None
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
+
+        self._unsub_activity_refresh = async_call_later(
+            self.hass, self.fast_poll_interval, request_refresh
+        )
+
+    @staticmethod
+    def _same_state(state, previous):
+        """Whether a raw state equals the one applied before, which has
+        the "_ts" key added.
+        """
+        if len(previous) != len(state) + 1:
+            return False
+        return all(
+            key in previous and previous[key] == value for key, value in state.items()
+        )
+
+    @staticmethod
+    def _device_values(device):
+        """Copy of the values update_state sets on a device."""
+        return {
+            name: copy.copy(value)
+            for name, value in vars(device).items()
+            if name != "_api"
+        }
+
+    async def _async_apply_device_state(
+        self, did, state, ts, priority=PRIORITY_POLL, force=False
+    ):
+        """Apply a state to the device, unless it is the same raw state
+        that was applied last time (and force isn't set). Requests the
+        device makes while applying it have the given priority.
+
+        Returns True if the device state has changed.
+        """
+        previous = self._states.get(did, {})
+        if ts < previous.get("_ts", 0.0):
+            # Superseded by a more recent state
+            return False
+
+        applied_ts = self._applied_ts.get(did)
+        unchanged = applied_ts is not None and self._same_state(state, previous)
+        if not force and unchanged and ts - applied_ts < UNCHANGED_STATE_MAX_AGE:
+            previous["_ts"] = ts
+            return False
 
         device = self.manager.devices[did]
         state["_ts"] = ts
         self._states[did] = state
-        await device.update_state(state, self.manager.api)
+        self._applied_ts[did] = ts
+        was_available = getattr(device, "available", False)
+        if isinstance(device, QUERYING_DEVICE_CLASSES):
+            # Values which aren't part of the state may change on their own
+            before = self._device_values(device) if unchanged else None
+            async with self.scheduler.slot(priority):
+                await device.update_state(state, self.manager.api)
+        else:
+            before = None
+            await device.update_state(state, self.manager.api)
+        if previous and getattr(device, "available", False) != was_available:
+            # Not counted for the first state of a device
+            self.availability_flips += 1
+        if unchanged:
+            return before is not None and self._device_values(device) != before
+        if applied_ts is not None and isinstance(device, HomePilotCover):
+            # Covers don't report movement, a changed position means
+            # the cover is still on its way
+            self._last_activity = time.monotonic()
+        return True
+
+    async def _async_apply_device_states(
+        self, states, ts, priority=PRIORITY_POLL, force=False
+    ):
+        """Apply the states of several devices concurrently.
+
+        Returns a dict with True for devices which have changed, or the
+        exception raised while applying the state.
+        """
+        async def apply(did):
+            # Applying the state of some devices queries the hub again
+            async with self._apply_semaphore:
+                return await self._async_apply_device_state(
+                    did, states[did], ts, priority, force
+                )
+
+        dids = list(states)
+        results = await asyncio.gather(
+            *(apply(did) for did in dids), return_exceptions=True
+        )
+        return dict(zip(dids, results))
+
+    def _mark_unavailable(self, did):
+        """Mark a device unavailable. Returns True if it was available."""
+        device: HomePilotDevice = self.manager.devices[did]
+        # Make sure the next state of the device is applied
+        self._applied_ts.pop(did, None)
+        was_available = getattr(device, "available", False)
+        device.available = False
+        if was_available:
+            self.availability_flips += 1
+        return was_available
+
+    @callback
+    def async_record_command_time(self, did, command, metric, duration):
+        """Keep the time a command of a device took until it was accepted
+        by the hub (metric "accept") or until the device reported the new
+        state ("confirm").
+        """
+        histograms = self.device_command_times.get((did, command))
+        if histograms is None:
+            histograms = self.device_command_times[(did, command)] = {
+                "accept": Histogram(),
+                "confirm": Histogram(),
+            }
+        histograms[metric].add(duration)
+        self.command_times[metric].add(duration)
+
+    def _count_timeout(self, source):
+        self.timeouts[source] = self.timeouts.get(source, 0) + 1
+
+    async def async_request(self, priority, func, *args):
+        """Make a request to the hub through the scheduler. The round trip
+        time, without the time waiting for a slot, is kept per function.
+        """
+        async with self.scheduler.slot(priority):
+            start = time.monotonic()
+            try:
+                return await func(*args)
+            finally:
+                histogram = self.request_times.get(func.__name__)
+                if histogram is None:
+                    histogram = self.request_times[func.__name__] = Histogram()
+                histogram.add(time.monotonic() - start)
+
+    async def async_send_command(self, func, *args):
+        """Send a command to the hub, ahead of any queued reads and polls.
+        Raises asyncio.TimeoutError after COMMAND_TIMEOUT seconds.
+        """
+        try:
+            async with asyncio.timeout(COMMAND_TIMEOUT):
+                return await self.async_request(PRIORITY_COMMAND, func, *args)
+        except asyncio.TimeoutError:
+            self._count_timeout("command")
+            raise
+
+    async def async_send_setpoint(self, did, key, func, *args):
+        """Send a setpoint command (eg. a target temperature) to the hub
+        once no new value for the same device and key arrived for
+        SETPOINT_QUIET_PERIOD seconds. Only the latest value is sent, and
+        only after the previous value of the same key was sent, so the hub
+        ends up with the value that was set last.
+
+        Returns True if this value was sent, or False if it was replaced
+        by a newer value or the same value is already being sent.
+        """
+        setpoint = self._setpoints.setdefault(
+            (did, key), {"pending": None, "in_flight": None, "unsub": None}
+        )
+        pending = setpoint["pending"]
+        if pending is not None and pending[1] == args:
+            # Same as the value waiting to be sent
+            return await asyncio.shield(pending[2])
+        if pending is None and setpoint["in_flight"] == args:
+            # Same as the value being sent right now
+            return False
+        if pending is not None:
+            pending[2].set_result(False)
+        future = self.hass.loop.create_future()
+        setpoint["pending"] = (func, args, future)
+        if setpoint["unsub"] is not None:
+            setpoint["unsub"]()
+
+        @callback
+        def send(_now):
+            setpoint["unsub"] = None
+            if setpoint["in_flight"] is None:
+                self.hass.async_create_task(self._async_send_setpoint(did, key))
+            # Otherwise it is sent once the value in flight was sent
+
+        setpoint["unsub"] = async_call_later(self.hass, SETPOINT_QUIET_PERIOD, send)
+        return await asyncio.shield(future)
+
+    async def _async_send_setpoint(self, did, key):
+        setpoint = self._setpoints.get((did, key))
+        if setpoint is None:
+            # Shut down in the meantime
+            return
+        try:
+            # Values whose quiet period ended while another one was in
+            # flight are sent right after it
+            while (
+                self._setpoints.get((did, key)) is setpoint
+                and setpoint["pending"] is not None
+                and setpoint["unsub"] is None
+            ):
+                func, args, future = setpoint["pending"]
+                setpoint["pending"] = None
+                setpoint["in_flight"] = args
+                try:
+                    await self.async_send_command(func, *args)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except BaseException as err:
+                    # Includes AuthError, which isn't an Exception
+                    future.set_exception(err)
+                else:
+                    future.set_result(True)
+                finally:
+                    setpoint["in_flight"] = None
+        finally:
+            if (
+                setpoint["pending"] is None
+                and self._setpoints.get((did, key)) is setpoint
+            ):
+                self._setpoints.pop((did, key))
+
+    async def _async_get_hub_state(self, priority=PRIORITY_POLL):
+        """Same as HomePilotManager.get_hub_state but with the requests
+        made concurrently.
+        """
+        api = self.manager.api
+        status, version, led = await asyncio.gather(
+            self.async_request(priority, api.async_get_fw_status),
+            self.async_request(priority, api.async_get_fw_version),
+            self.async_request(priority, api.async_get_led_status),
+        )
+        return {"status": status, "version": version, "led": led}
 
     async def _async_update_states_of_all_devices(self):
+        """Update the states of all devices except the hub, which is
+        polled at its own interval (see _async_poll_hub).
+        """
         ts = time.time()
+        start = time.monotonic()
+        changed = set()
+        dids = [did for did in self.manager.devices if did != "-1"]
         try:
-            states = await self.manager.api.async_get_devices_state()
-            states["-1"] = await self.manager.get_hub_state()
-        except AuthError:  # pylint: disable=try-except-raise
+            states = await self.async_request(
+                PRIORITY_POLL, self.manager.api.async_get_devices_state
+            )
+        except AuthError:
             raise
-        except:
-            for did in self.manager.devices:
-                device: HomePilotDevice = self.manager.devices[did]
-                device.available = False
+        except asyncio.CancelledError:
+            # Cancelled, eg. by the timeout
+            for did in dids:
+                if self._mark_unavailable(did):
+                    changed.add(did)
+            self._changed_devices |= changed
             raise
+        except Exception as err:
+            devices_error = err
+            states = {}
+        else:
+            devices_error = None
+        fetched = time.monotonic()
+        cpu_start = time.thread_time()
 
-        for did in self.manager.devices:
-            if did in states:
-                await self._async_apply_device_state(did, states[did], ts)
-            else:
-                device: HomePilotDevice = self.manager.devices[did]
-                device.available = False
+        results = await self._async_apply_device_states(
+            {did: states[did] for did in dids if did in states}, ts
+        )
+        for did, result in results.items():
+            if isinstance(result, AuthError):
+                raise result
+            if isinstance(result, BaseException):
+                _LOGGER.warning("Error updating state of device %s: %s", did, result)
+                if self._mark_unavailable(did):
+                    changed.add(did)
+            elif result:
+                changed.add(did)
+        for did in dids:
+            if did not in states and self._mark_unavailable(did):
+                changed.add(did)
+        self._changed_devices |= changed
+        end = time.monotonic()
+        # Comparable between versions: the apply phase and the state writes
+        # are the work done by the integration itself, the fetch phase
+        # depends on the hub.
+        self.poll_durations.add(end - start)
+        self.last_poll = {
+            "duration": end - start,
+            "fetch": fetched - start,
+            "apply": end - fetched,
+            # CPU time of the event loop thread while applying
+            "apply_cpu": time.thread_time() - cpu_start,
+            "devices": len(dids),
+            "changed": len(changed),
+        }
+        _LOGGER.debug(
+            "Poll took %.3f s (fetch %.3f s, apply %.3f s), changed devices: %s",
+            end - start,
+            fetched - start,
+            end - fetched,
+            changed,
+        )
+
+        if devices_error is not None:
+            raise UpdateFailed(
+                f"Error fetching device states: {devices_error}"
+            ) from devices_error
+        return changed
 
     async def async_update_device_state(self, did):
-        """Query the state of a single device and apply it."""
+        """Query the state of a single device and apply it.
+        Returns True if the device state has changed.
+
+        Reads requested within READ_COALESCE_WINDOW seconds of each other
+        are merged, eg. when an automation moves many covers at once.
+        """
+        self.async_mark_activity()
+        future = self._pending_reads.get(did)
+        if future is None:
+            future = self._pending_reads[did] = self.hass.loop.create_future()
+            if self._unsub_read_flush is None:
+                self._unsub_read_flush = async_call_later(
+                    self.hass, READ_COALESCE_WINDOW, self._async_flush_reads
+                )
+        return await asyncio.shield(future)
+
+    @callback
+    def _async_flush_reads(self, _now=None):
+        self._unsub_read_flush = None
+        pending, self._pending_reads = self._pending_reads, {}
+        self.hass.async_create_task(self._async_read_device_states(pending))
+
+    async def _async_fetch_device_states(self, dids):
+        """Fetch the states of the given devices. Uses one bulk request
+        when that is cheaper than one request per device.
+
+        Returns a dict of states, or exceptions for devices which failed.
+        """
+        api = self.manager.api
+        device_dids = [did for did in dids if did != "-1"]
+        bulk = len(device_dids) > BULK_READ_THRESHOLD
+        requests = (
+            [self.async_request(PRIORITY_READ, api.async_get_devices_state)]
+            if bulk
+            else [
+                self.async_request(PRIORITY_READ, api.async_get_device_state, did)
+                for did in device_dids
+            ]
+        )
+        if "-1" in dids:
+            requests.append(self._async_get_hub_state(PRIORITY_READ))
+        try:
+            async with asyncio.timeout(10):
+                results = await asyncio.gather(*requests, return_exceptions=True)
+        except asyncio.TimeoutError as err:
+            self._count_timeout("read")
+            results = [err] * len(requests)
+
+        states = {}
+        if "-1" in dids:
+            states["-1"] = results.pop()
+        if bulk:
+            for did in device_dids:
+                if isinstance(results[0], BaseException):
+                    states[did] = results[0]
+                elif did in results[0]:
+                    states[did] = results[0][did]
+        else:
+            states.update(zip(device_dids, results))
+        return states
+
+    async def _async_read_device_states(self, pending):
+        """Read and apply the states of the pending devices and pass the
+        results on to the callers waiting for them.
+        """
         ts = time.time()
+        changed = set()
         try:
-            state = await self.manager.api.async_get_device_state(did)
-        except AuthError:  # pylint: disable=try-except-raise
-            raise
-        except:
-            device: HomePilotDevice = self.manager.devices[did]
-            device.available = False
-            raise
-        await self._async_apply_device_state(did, state, ts)
+            states = await self._async_fetch_device_states(list(pending))
+            results = await self._async_apply_device_states(
+                {
+                    did: state
+                    for did, state in states.items()
+                    if not isinstance(state, BaseException)
+                },
+                ts,
+                PRIORITY_READ,
+                # Reads follow commands, which may have changed values the
+                # device queries separately (eg. the ventilation position)
+                force=True,
+            )
+            # Errors while fetching as well as while applying
+            results.update(
+                (did, state)
+                for did, state in states.items()
+                if isinstance(state, BaseException)
+            )
+            for did, future in pending.items():
+                result = results.get(did, False)
+                if did not in results or isinstance(result, BaseException):
+                    # Failed, or not reported by the hub at all
+                    if self._mark_unavailable(did):
+                        changed.add(did)
+                elif result:
+                    changed.add(did)
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            for future in pending.values():
+                if not future.done():
+                    future.cancel()
+            self._async_dispatch(changed)
+
+    async def async_watch(self, did, condition, max_wait=5.0):
+        """Keep querying the state of a device until condition(state) is
+        true for its most recent state, up to max_wait seconds.
+        Returns True if the condition was met.
+
+        All watched devices are queried together by a single poller, so
+        watching many devices at once costs one request per poll.
+        """
+        future = self.hass.loop.create_future()
+        self._watches.setdefault(did, []).append(
+            (condition, time.monotonic() + max_wait, future)
+        )
+        # Query soon, the state is about to change
+        self._watch_delay = WATCH_MIN_DELAY
+        if self._watch_task is None:
+            self._watch_task = self.hass.async_create_task(self._async_watch_loop())
+        return await future
+
+    async def _async_watch_loop(self):
+        try:
+            while self._watches:
+                dids = list(self._watches)
+                # Reads of all watched devices are coalesced
+                await asyncio.gather(
+                    *(self.async_update_device_state(did) for did in dids),
+                    return_exceptions=True,
+                )
+                now = time.monotonic()
+                for did in dids:
+                    state = self.get_last_state(did)
+                    watches = []
+                    for watch in self._watches.get(did, ()):
+                        condition, deadline, future = watch
+                        if future.done():
+                            # The caller is no longer waiting
+                            continue
+                        if state is not None and condition(state):
+                            future.set_result(True)
+                        elif now >= deadline:
+                            future.set_result(False)
+                        else:
+                            watches.append(watch)
+                    if watches:
+                        self._watches[did] = watches
+                    else:
+                        self._watches.pop(did, None)
+                if self._watches:
+                    await asyncio.sleep(self._watch_delay)
+                    # Exponential backoff, up to WATCH_MAX_DELAY
+                    self._watch_delay = min(self._watch_delay * 2, WATCH_MAX_DELAY)
+        finally:
+            self._watch_task = None
+            self._async_end_watches()
+
+    @callback
+    def _async_end_watches(self):
+        """Tell the callers of all remaining watches that their condition
+        wasn't met, when the watch loop stops early.
+        """
+        watches, self._watches = self._watches, {}
+        for did_watches in watches.values():
+            for _condition, _deadline, future in did_watches:
+                if not future.done():
+                    future.set_result(False)
 
     def get_last_state(self, did, default=None):
         """Get the most recent state of a device."""
         return self._states.get(did, default)
+
+    @callback
+    def async_shutdown(self):
+        """Cancel pending timers. Called when the entry is unloaded."""
+        if self._unsub_coordinator is not None:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+        if self._unsub_hub_poll is not None:
+            self._unsub_hub_poll()
+            self._unsub_hub_poll = None
+        if self._firmware_update_task is not None:
+            self._firmware_update_task.cancel()
+        if self._unsub_channel_poll is not None:
+            self._unsub_channel_poll()
+            self._unsub_channel_poll = None
+        if self._unsub_activity_refresh is not None:
+            self._unsub_activity_refresh()
+            self._unsub_activity_refresh = None
+        if self._unsub_read_flush is not None:
+            self._unsub_read_flush()
+            self._unsub_read_flush = None
+        # The reads won't be done, report them as unchanged
+        pending, self._pending_reads = self._pending_reads, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result(False)
+        for setpoint in self._setpoints.values():
+            if setpoint["unsub"] is not None:
+                setpoint["unsub"]()
+            if setpoint["pending"] is not None:
+                setpoint["pending"][2].cancel()
+        self._setpoints.clear()
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        # Also if the loop hasn't started yet, then its finally won't run
+        self._async_end_watches()
+        if self._traffic_recording is not None:
+            self._async_stop_traffic_recording()
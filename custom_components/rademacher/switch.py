@@ -7,7 +7,6 @@ from homepilot.hub import HomePilotHub
 from homepilot.switch import HomePilotSwitch
 
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
-from homeassistant.const import CONF_EXCLUDE
 from homeassistant.helpers.entity import EntityCategory
 
 from .const import DOMAIN
@@ -20,27 +19,25 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for switch platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("switch", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the switch entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotHub):
-                _LOGGER.info("Found Led Switch for Device ID: %s", device.did)
-                new_entities.append(HomePilotLedSwitchEntity(state_manager, device))
-                new_entities.append(HomePilotAutoUpdaeSwitchEntity(state_manager, device))
-            if isinstance(device, HomePilotSwitch):
-                _LOGGER.info("Found Switch for Device ID: %s", device.did)
-                new_entities.append(HomePilotSwitchEntity(state_manager, device))
-            if isinstance(device, HomePilotCover):
-                cover: HomePilotCover = device
-                if cover.has_ventilation_position_config:
-                    _LOGGER.info("Found Ventilation Position Config Switch for Device ID: %s", device.did)
-                    new_entities.append(HomePilotVentilationSwitchEntity(state_manager, device))
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(HomePilotHub):
+        _LOGGER.debug("Found Led Switch for Device ID: %s", device.did)
+        new_entities.append(HomePilotLedSwitchEntity(state_manager, device))
+        new_entities.append(HomePilotAutoUpdaeSwitchEntity(state_manager, device))
+    for device in state_manager.get_devices(HomePilotSwitch):
+        _LOGGER.debug("Found Switch for Device ID: %s", device.did)
+        new_entities.append(HomePilotSwitchEntity(state_manager, device))
+    for device in state_manager.get_devices(
+        HomePilotCover, "has_ventilation_position_config"
+    ):
+        _LOGGER.debug("Found Ventilation Position Config Switch for Device ID: %s", device.did)
+        new_entities.append(HomePilotVentilationSwitchEntity(state_manager, device))
+    return new_entities
 
 
 class HomePilotSwitchEntity(HomePilotEntity, SwitchEntity):
@@ -64,13 +61,13 @@ class HomePilotSwitchEntity(HomePilotEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
         device: HomePilotSwitch = self.coordinator.data[self.did]
-        await device.async_turn_on()
+        await self.async_send_command(device.async_turn_on)
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
         device: HomePilotSwitch = self.coordinator.data[self.did]
-        await device.async_turn_off()
+        await self.async_send_command(device.async_turn_off)
         await self.async_update_device_state()
 
     async def async_toggle(self, **kwargs):
@@ -104,13 +101,13 @@ class HomePilotLedSwitchEntity(HomePilotEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
         device: HomePilotHub = self.coordinator.data[self.did]
-        await device.async_turn_led_on()
+        await self.async_send_command(device.async_turn_led_on)
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
         device: HomePilotHub = self.coordinator.data[self.did]
-        await device.async_turn_led_off()
+        await self.async_send_command(device.async_turn_led_off)
         await self.async_update_device_state()
 
     async def async_toggle(self, **kwargs):
@@ -143,13 +140,13 @@ class HomePilotAutoUpdaeSwitchEntity(HomePilotEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
         device: HomePilotHub = self.coordinator.data[self.did]
-        await device.async_set_auto_update_on()
+        await self.async_send_command(device.async_set_auto_update_on)
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
         device: HomePilotHub = self.coordinator.data[self.did]
-        await device.async_set_auto_update_off()
+        await self.async_send_command(device.async_set_auto_update_off)
         await self.async_update_device_state()
 
     async def async_toggle(self, **kwargs):
@@ -182,13 +179,13 @@ class HomePilotVentilationSwitchEntity(HomePilotEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_set_ventilation_position_mode(True)
+        await self.async_send_command(device.async_set_ventilation_position_mode, True)
         await self.async_update_device_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
         device: HomePilotCover = self.coordinator.data[self.did]
-        await device.async_set_ventilation_position_mode(False)
+        await self.async_send_command(device.async_set_ventilation_position_mode, False)
         await self.async_update_device_state()
 
     async def async_toggle(self, **kwargs):
@@ -0,0 +1,63 @@
+"""Recordings of the traffic between the integration and the hub.
+
+A recording is a gzipped file of JSON lines. The first line holds the
+discovery responses of the hub and the entry options, so the devices and
+entities can be built without the hub, every other line is one request.
+Requests are appended while recording, see RademacherApi.take_traffic.
+"""
+import gzip
+import json
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TRAFFIC_VERSION = 2
+
+
+def traffic_path(hass: HomeAssistant, uid: str) -> str:
+    """Path of a new recording for the hub with the given uid."""
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    return hass.config.path(f"{DOMAIN}_traffic_{uid}_{timestamp}.json.gz")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":")) + "\n"
+
+
+def start_traffic(path: str, discovery: dict, options: dict) -> int:
+    """Create a recording. Returns the number of bytes written, before
+    compression.
+    """
+    line = _dumps(
+        {"version": TRAFFIC_VERSION, "discovery": discovery, "options": options}
+    )
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(line)
+    return len(line)
+
+
+def append_traffic(path: str, records: list) -> int:
+    """Append requests to a recording. Returns the number of bytes
+    written, before compression.
+    """
+    data = "".join(_dumps(record) for record in records)
+    # Every append adds a gzip member, they are read as one stream
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.write(data)
+    return len(data)
+
+
+def load_traffic(path: str) -> dict:
+    """Read a recording. Returns the first line, with the requests as
+    "traffic".
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        recording = json.loads(file.readline())
+        if recording.get("version") != TRAFFIC_VERSION:
+            raise ValueError(
+                f"Unsupported recording version {recording.get('version')}"
+            )
+        recording["traffic"] = [json.loads(line) for line in file if line.strip()]
+    return recording
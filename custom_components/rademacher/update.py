@@ -10,7 +10,6 @@ from homeassistant.components.update import (
     UpdateEntity,
     UpdateEntityFeature,
 )
-from homeassistant.const import CONF_EXCLUDE
 
 from .const import DOMAIN
 from .entity import HomePilotEntity
@@ -22,27 +21,25 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Setup of entities for switch platform."""
     state_manager: StateManager = hass.data[DOMAIN][config_entry.entry_id]
-    manager = state_manager.manager
-    exclude_devices: list[str] = state_manager.entry_options[CONF_EXCLUDE]
+    state_manager.async_setup_platform("update", build_entities, async_add_entities)
+
+
+def build_entities(state_manager: StateManager) -> list:
+    """Build the update entities of the devices which aren't excluded."""
     new_entities = []
-    for did in manager.devices:
-        if did not in exclude_devices:
-            device: HomePilotDevice = manager.devices[did]
-            if isinstance(device, HomePilotHub):
-                _LOGGER.info("Found FW Update Sensor for Device ID: %s", device.did)
-                new_entities.append(
-                    HomePilotUpdateEntity(
-                        state_manager=state_manager,
-                        device=device,
-                        id_suffix="fw_update",
-                        name_suffix="Firmware Update",
-                        device_class=UpdateDeviceClass.FIRMWARE,
-                        supported_features=(UpdateEntityFeature.INSTALL | UpdateEntityFeature.PROGRESS)
-                    )
-                )
-    # If we have any new devices, add them
-    if new_entities:
-        async_add_entities(new_entities)
+    for device in state_manager.get_devices(HomePilotHub):
+        _LOGGER.debug("Found FW Update Sensor for Device ID: %s", device.did)
+        new_entities.append(
+            HomePilotUpdateEntity(
+                state_manager=state_manager,
+                device=device,
+                id_suffix="fw_update",
+                name_suffix="Firmware Update",
+                device_class=UpdateDeviceClass.FIRMWARE,
+                supported_features=(UpdateEntityFeature.INSTALL | UpdateEntityFeature.PROGRESS)
+            )
+        )
+    return new_entities
 
 
 class HomePilotUpdateEntity(HomePilotEntity, UpdateEntity):
@@ -94,4 +91,7 @@ class HomePilotUpdateEntity(HomePilotEntity, UpdateEntity):
         """Install update."""
         device: HomePilotHub = self.coordinator.data[self.did]
         _LOGGER.info("Install update v:%s b:%s", version, backup)
-        await device.async_update_firmware()
+        await self.async_send_command(device.async_update_firmware)
+        # The progress is only part of the hub state, which is otherwise
+        # polled every few minutes
+        self.state_manager.async_track_firmware_update()
@@ -0,0 +1,81 @@
+"""Fixtures for the tests of the Rademacher integration."""
+import json
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_API_VERSION, CONF_HOST, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.const import DOMAIN
+
+from .simulator import MAC_ADDRESS, HomePilotSimulator
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+# Benchmark name -> measurements, see test_benchmark.py
+BENCHMARK_RESULTS: dict[str, dict] = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-output",
+        help="write the benchmark results to this JSON file",
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not BENCHMARK_RESULTS:
+        return
+    text = json.dumps(BENCHMARK_RESULTS, indent=2, sort_keys=True)
+    terminalreporter.write_sep("=", "benchmark results")
+    terminalreporter.write_line(text)
+    path = config.getoption("--benchmark-output")
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+
+@pytest.fixture
+def benchmark_results() -> dict[str, dict]:
+    """Add the measurements of a benchmark to the results."""
+    return BENCHMARK_RESULTS
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Allow Home Assistant to load the integration."""
+    yield
+
+
+@pytest.fixture
+def start_simulator(socket_enabled):
+    """Start simulated hubs, which are stopped after the test."""
+    simulators = []
+
+    def start(*args, **kwargs) -> HomePilotSimulator:
+        simulator = HomePilotSimulator(*args, **kwargs)
+        simulator.start()
+        simulators.append(simulator)
+        return simulator
+
+    yield start
+    for simulator in simulators:
+        simulator.stop()
+
+
+async def async_setup_simulated_entry(
+    hass: HomeAssistant, simulator: HomePilotSimulator, options: dict | None = None
+) -> MockConfigEntry:
+    """Set up a config entry for a simulated hub."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        unique_id=MAC_ADDRESS,
+        data={CONF_HOST: simulator.host, CONF_PASSWORD: "", CONF_API_VERSION: 1},
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
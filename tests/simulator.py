@@ -0,0 +1,276 @@
+"""Simulated HomePilot hub for the tests and benchmarks.
+
+An aiohttp server answering the endpoints used through the homepilot
+library: discovery, device states (bulk and per device), commands, hub
+state and scenes. It has a configurable number of devices and an injected
+latency per request, and counts the requests it answers.
+
+The server runs its own event loop in a separate thread, so the time it
+spends answering doesn't count towards the event loop of Home Assistant.
+"""
+import asyncio
+from collections import Counter
+import threading
+
+from aiohttp import web
+
+MAC_ADDRESS = "00:11:22:33:44:55"
+FW_VERSION = "5.4.9"
+
+# Share of each device type, the rest are sensors
+COVER_SHARE = 0.6
+SWITCH_SHARE = 0.2
+FIRST_DID = 1000
+
+# Position of actuators, 0 is open (cover) or off (switch)
+COMMAND_POSITIONS = {
+    "POS_UP_CMD": 0,
+    "POS_DOWN_CMD": 100,
+    "TURN_ON_CMD": 100,
+    "TURN_OFF_CMD": 0,
+}
+
+
+def _capabilities(did: int, device_type: str, name: str, extra=()) -> dict:
+    capabilities = [
+        {"name": "ID_DEVICE_LOC", "value": str(did)},
+        {"name": "DEVICE_TYPE_LOC", "value": device_type},
+        {"name": "PROT_ID_DEVICE_LOC", "value": f"{did:08x}"},
+        {"name": "NAME_DEVICE_LOC", "value": name},
+        {"name": "PROD_CODE_DEVICE_LOC", "value": "00000000"},
+        {"name": "VERSION_CFG", "value": "1.0"},
+    ]
+    capabilities += [{"name": name, "value": "false"} for name in extra]
+    return {"capabilities": capabilities}
+
+
+class HomePilotSimulator:
+    """Devices are covers, switches and sensors in fixed shares, plus the
+    given number of wall controllers. Use start() and stop(), or the
+    fixture in conftest.py.
+    """
+
+    def __init__(self, devices: int = 50, walls: int = 0, latency: float = 0.0):
+        # Seconds every request takes, can be changed at any time
+        self.latency = latency
+        # Seconds until a command changes the state of the device
+        self.travel_time = 0.0
+        # (method, path) -> number of requests answered
+        self.requests: Counter = Counter()
+        # Client (host, port) of every connection requests came in on
+        self.connections: set[tuple] = set()
+        self.devices: dict[int, dict] = {}
+        self.states: dict[int, dict] = {}
+        self.scenes = [
+            {"id": 1, "name": "All up", "description": "", "is_manual_executable": 1}
+        ]
+        self.led = "enabled"
+        covers = int(devices * COVER_SHARE)
+        switches = int(devices * SWITCH_SHARE)
+        for index in range(devices + walls):
+            did = FIRST_DID + index
+            if index < covers:
+                self._add(did, "2", "Cover", ["GOTO_POS_CMD", "PING_CMD"],
+                          statusesMap={"Position": 0})
+            elif index < covers + switches:
+                self._add(did, "1", "Switch", ["PING_CMD"], statusesMap={"Position": 0})
+            elif index < devices:
+                self._add(
+                    did, "3", "Sensor",
+                    ["TEMP_CURR_DEG_MEA", "RAIN_DETECTION_MEA", "SUN_DETECTION_MEA"],
+                    readings={
+                        "temperature_primary": 20.0,
+                        "rain_detected": False,
+                        "sun_detected": False,
+                    },
+                )
+            else:
+                self._add(did, "10", "Wall", [], batteryLow=False)
+                for channel in (1, 2):
+                    self.devices[did]["capabilities"].append(
+                        {"name": f"KEY_PUSH_CH{channel}_EVT", "timestamp": 0}
+                    )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._runner: web.AppRunner | None = None
+        self.host: str | None = None
+
+    def _add(self, did, device_type, kind, extra, **state):
+        self.devices[did] = _capabilities(did, device_type, f"{kind} {did}", extra)
+        self.states[did] = {"did": did, "statusValid": True, **state}
+
+    def dids(self, device_type: str) -> list[int]:
+        """IDs of the devices of a type, eg. "2" for covers."""
+        return [
+            did for did, device in self.devices.items()
+            if device["capabilities"][1]["value"] == device_type
+        ]
+
+    def change_states(self, fraction: float, seed: int = 0):
+        """Change the state of a fixed share of the devices, a different
+        (but deterministic) set for every seed.
+        """
+        dids = list(self.states)
+        count = int(len(dids) * fraction)
+        start = seed * count % len(dids)
+
+        def change():
+            for did in (dids + dids)[start:start + count]:
+                state = self.states[did]
+                if "statusesMap" in state:
+                    state["statusesMap"]["Position"] = (
+                        state["statusesMap"]["Position"] + 10
+                    ) % 110
+                elif "readings" in state:
+                    state["readings"]["temperature_primary"] += 0.5
+                else:
+                    state["batteryLow"] = not state["batteryLow"]
+
+        self.call(change)
+
+    def call(self, func, *args):
+        """Run func in the thread of the server and return its result."""
+        if self._loop is None:
+            return func(*args)
+        future = asyncio.run_coroutine_threadsafe(self._async_call(func, *args), self._loop)
+        return future.result()
+
+    @staticmethod
+    async def _async_call(func, *args):
+        return func(*args)
+
+    def start(self):
+        """Start serving on a free port of 127.0.0.1, sets host."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._async_start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="homepilot-simulator")
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    async def _async_start(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/devices", self._get_devices)
+        app.router.add_get("/devices/{did}", self._get_device)
+        app.router.add_put("/devices/{did}", self._put_device)
+        app.router.add_get("/v4/devices", self._get_devices_state)
+        app.router.add_get("/v4/devices/{did}", self._get_device_state)
+        app.router.add_get("/service/system-update-image/status", self._get_fw_status)
+        app.router.add_get("/service/system-update-image/version", self._get_fw_version)
+        app.router.add_get("/service/system/leds/status", self._get_led_status)
+        app.router.add_post("/service/system/leds/{action}", self._post_led)
+        app.router.add_get(
+            "/service/system/networkmgr/v1/interfaces", self._get_interfaces
+        )
+        app.router.add_get("/service/system/networkmgr/v1/nodename", self._get_nodename)
+        app.router.add_get("/scenes", self._get_scenes)
+        app.router.add_post("/scenes/{sid}/actions", self._post_scene_action)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.host = f"127.0.0.1:{port}"
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests[request.method, request.match_info.route.resource.canonical] += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def _get_devices(self, request):
+        return web.json_response(
+            {"error_code": 0, "payload": {"devices": list(self.devices.values())}}
+        )
+
+    async def _get_device(self, request):
+        device = self.devices.get(int(request.match_info["did"]))
+        if device is None:
+            return web.json_response({"error_code": 22})
+        return web.json_response({"error_code": 0, "payload": {"device": device}})
+
+    async def _put_device(self, request):
+        did = int(request.match_info["did"])
+        command = await request.json()
+        position = COMMAND_POSITIONS.get(command["name"])
+        if command["name"] == "GOTO_POS_CMD":
+            position = int(command["value"])
+        if position is not None and did in self.states:
+
+            def move():
+                self.states[did]["statusesMap"]["Position"] = position
+
+            asyncio.get_running_loop().call_later(self.travel_time, move)
+        return web.json_response({"error_code": 0})
+
+    async def _get_devices_state(self, request):
+        devtype = request.query["devtype"]
+        if devtype == "Actuator":
+            return web.json_response({
+                "response": "get_visible_devices",
+                "devices": [s for s in self.states.values() if "statusesMap" in s],
+            })
+        if devtype == "Sensor":
+            return web.json_response({
+                "response": "get_meters",
+                "meters": [s for s in self.states.values() if "readings" in s],
+            })
+        return web.json_response({
+            "response": "get_transmitters",
+            "transmitters": [s for s in self.states.values() if "batteryLow" in s],
+        })
+
+    async def _get_device_state(self, request):
+        state = self.states.get(int(request.match_info["did"]))
+        if state is None:
+            return web.json_response({"response": "error"})
+        return web.json_response({"response": "get_device", "device": state})
+
+    async def _get_fw_status(self, request):
+        return web.json_response(
+            {"update_status": "NO_UPDATE_AVAILABLE", "version": FW_VERSION}
+        )
+
+    async def _get_fw_version(self, request):
+        return web.json_response({
+            "version": FW_VERSION,
+            "df_stick_version": "2.0",
+            "hw_platform": "ampere",
+            "sw_platform": "hp",
+        })
+
+    async def _get_led_status(self, request):
+        return web.json_response({"status": self.led})
+
+    async def _post_led(self, request):
+        self.led = "enabled" if request.match_info["action"] == "enable" else "disabled"
+        return web.json_response({"error_code": 0})
+
+    async def _get_interfaces(self, request):
+        return web.json_response(
+            {"interfaces": {"eth0": {"enabled": True, "address": MAC_ADDRESS}}}
+        )
+
+    async def _get_nodename(self, request):
+        return web.json_response({"nodename": "homepilot"})
+
+    async def _get_scenes(self, request):
+        return web.json_response({"scenes": self.scenes})
+
+    async def _post_scene_action(self, request):
+        return web.json_response({"error_code": 0})
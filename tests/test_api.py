@@ -0,0 +1,26 @@
+"""Connections the library opens to the hub."""
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.const import DOMAIN
+
+from .conftest import async_setup_simulated_entry
+
+CYCLES = 5
+
+
+async def test_connection_per_call(hass: HomeAssistant, start_simulator):
+    """The library opens a new session, and so a new connection, for every
+    call. Only the requests of one call share a connection, eg. the three
+    of the bulk state query made by every poll cycle.
+    """
+    simulator = start_simulator(10)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    simulator.requests.clear()
+    simulator.connections.clear()
+
+    for _ in range(CYCLES):
+        await state_manager.coordinator.async_refresh()
+    assert sum(simulator.requests.values()) == 3 * CYCLES
+    assert len(simulator.connections) == CYCLES
+    assert await hass.config_entries.async_unload(entry.entry_id)
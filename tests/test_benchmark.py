@@ -0,0 +1,238 @@
+"""Performance benchmarks against the simulated hub. Not part of the
+default run, use:
+
+    pytest -m benchmark --benchmark-output=results.json
+
+Every benchmark uses fixed device mixes, latencies and state changes, so
+the results of two commits can be compared.
+"""
+import asyncio
+import statistics
+import time
+
+import pytest
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from custom_components.rademacher.const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+from custom_components.rademacher.scheduler import PRIORITY_POLL
+from custom_components.rademacher.state_manager import StateManager
+
+from .conftest import async_setup_simulated_entry
+
+pytestmark = pytest.mark.benchmark
+
+DEVICE_COUNTS = [50, 300, 1000]
+# Seconds every request to the simulated hub takes
+LATENCY = 0.02
+# Poll cycles measured per device count
+CYCLES = 10
+# Share of the devices whose state changes before every poll cycle
+CHANGED_SHARE = 0.1
+# Commands measured per device count, and the seconds a cover takes to
+# reach its new position
+COMMANDS = 3
+TRAVEL_TIME = 0.5
+# Polling interval while the poll cycles are measured, so that only the
+# measured cycles run
+IDLE_POLL_INTERVAL = 3600
+# Seconds after the start of a poll cycle until a command is sent, the
+# bulk fetch takes three requests
+COMMAND_DELAY = 4 * LATENCY
+
+
+@pytest.fixture(autouse=True)
+def disable_loop_debug(hass: HomeAssistant):
+    """The tests run the event loop in debug mode, which adds a stack
+    capture to every task and callback. Benchmarks measure without it.
+    """
+    hass.loop.set_debug(False)
+
+
+def summary(values: list[float]) -> dict:
+    return {
+        "median": statistics.median(values),
+        "max": max(values),
+    }
+
+
+async def async_measure_poll_cycles(
+    hass: HomeAssistant, monkeypatch, start_simulator, devices, changed_share
+) -> dict:
+    """Latency, event loop time and state writes of poll cycles, with
+    the given share of the devices changed before every cycle.
+    """
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.DEFAULT_POLL_INTERVAL",
+        IDLE_POLL_INTERVAL,
+    )
+    simulator = start_simulator(devices)
+    entry = await async_setup_simulated_entry(
+        hass,
+        simulator,
+        {
+            CONF_FAST_POLL_INTERVAL: IDLE_POLL_INTERVAL,
+            CONF_SLOW_POLL_INTERVAL: IDLE_POLL_INTERVAL,
+        },
+    )
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    simulator.latency = LATENCY
+
+    durations, loop_times, apply_cpu, state_writes = [], [], [], []
+    for cycle in range(CYCLES):
+        simulator.change_states(changed_share, cycle)
+        # The test runs the event loop in this thread
+        loop_start = time.thread_time()
+        await state_manager.coordinator.async_refresh()
+        await hass.async_block_till_done()
+        loop_times.append(time.thread_time() - loop_start)
+        durations.append(state_manager.last_poll["duration"])
+        apply_cpu.append(state_manager.last_poll["apply_cpu"])
+        state_writes.append(state_manager.last_poll["state_writes"])
+
+    # Every changed device updates at least one entity
+    assert min(state_writes) >= int(devices * changed_share)
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    return {
+        "latency": LATENCY,
+        "cycles": CYCLES,
+        "changed_share": changed_share,
+        "duration": summary(durations),
+        "loop_time": summary(loop_times),
+        "apply_cpu": summary(apply_cpu),
+        "state_writes": statistics.mean(state_writes),
+    }
+
+
+@pytest.mark.parametrize("devices", DEVICE_COUNTS)
+async def test_poll_cycle(
+    hass: HomeAssistant, monkeypatch, start_simulator, benchmark_results, devices
+):
+    """Poll cycles with some devices changed."""
+    benchmark_results[f"poll_cycle[{devices}]"] = await async_measure_poll_cycles(
+        hass, monkeypatch, start_simulator, devices, CHANGED_SHARE
+    )
+
+
+@pytest.mark.parametrize("devices", DEVICE_COUNTS)
+async def test_unchanged_poll_cycle(
+    hass: HomeAssistant, monkeypatch, start_simulator, benchmark_results, devices
+):
+    """Poll cycles without any changes, where the states of all devices
+    are compared with the previous ones and skipped.
+    """
+    benchmark_results[
+        f"unchanged_poll_cycle[{devices}]"
+    ] = await async_measure_poll_cycles(hass, monkeypatch, start_simulator, devices, 0)
+
+
+@pytest.mark.parametrize("devices", DEVICE_COUNTS)
+async def test_command_confirmation(
+    hass: HomeAssistant, start_simulator, benchmark_results, devices
+):
+    """Time from a cover command until its entity shows the new position,
+    with the default polling intervals.
+    """
+    simulator = start_simulator(devices)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    simulator.latency = LATENCY
+    simulator.travel_time = TRAVEL_TIME
+    entity_ids = sorted(state.entity_id for state in hass.states.async_all("cover"))
+
+    latencies = []
+    for command in range(COMMANDS):
+        entity_id = entity_ids[command]
+        position = 30 + command
+        confirmed = asyncio.Event()
+
+        @callback
+        def state_changed(event: Event):
+            new_state = event.data["new_state"]
+            if new_state.attributes.get("current_position") == position:
+                confirmed.set()
+
+        unsub = async_track_state_change_event(hass, [entity_id], state_changed)
+        start = time.monotonic()
+        await hass.services.async_call(
+            "cover",
+            "set_cover_position",
+            {"entity_id": entity_id, "position": position},
+            blocking=True,
+        )
+        await asyncio.wait_for(confirmed.wait(), 30)
+        latencies.append(time.monotonic() - start)
+        unsub()
+
+    benchmark_results[f"command_confirmation[{devices}]"] = {
+        "latency": LATENCY,
+        "travel_time": TRAVEL_TIME,
+        "commands": COMMANDS,
+        "confirmation": summary(latencies),
+    }
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize("scheduling", ["priority", "fifo"])
+@pytest.mark.parametrize("devices", DEVICE_COUNTS)
+async def test_command_during_poll(
+    hass: HomeAssistant,
+    monkeypatch,
+    start_simulator,
+    benchmark_results,
+    devices,
+    scheduling,
+):
+    """Time until the hub accepts a command sent during a poll cycle.
+
+    With "fifo" commands queue up behind the requests of the poll, as
+    without priorities in the scheduler, for comparison.
+    """
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.DEFAULT_POLL_INTERVAL",
+        IDLE_POLL_INTERVAL,
+    )
+    if scheduling == "fifo":
+
+        async def async_send_command(self, func, *args):
+            return await self.async_request(PRIORITY_POLL, func, *args)
+
+        monkeypatch.setattr(StateManager, "async_send_command", async_send_command)
+    simulator = start_simulator(devices)
+    entry = await async_setup_simulated_entry(
+        hass,
+        simulator,
+        {
+            CONF_FAST_POLL_INTERVAL: IDLE_POLL_INTERVAL,
+            CONF_SLOW_POLL_INTERVAL: IDLE_POLL_INTERVAL,
+        },
+    )
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    simulator.latency = LATENCY
+    covers = [
+        state_manager.manager.devices[str(did)] for did in simulator.dids("2")
+    ]
+
+    latencies = []
+    for cycle in range(CYCLES):
+        simulator.change_states(CHANGED_SHARE, cycle)
+        refresh = hass.async_create_task(state_manager.coordinator.async_refresh())
+        await asyncio.sleep(COMMAND_DELAY)
+        cover = covers[cycle % len(covers)]
+        start = time.monotonic()
+        await state_manager.async_send_command(cover.async_set_cover_position, 50)
+        latencies.append(time.monotonic() - start)
+        await refresh
+        await hass.async_block_till_done()
+
+    benchmark_results[f"command_during_poll[{devices}-{scheduling}]"] = {
+        "latency": LATENCY,
+        "cycles": CYCLES,
+        "changed_share": CHANGED_SHARE,
+        "accept": summary(latencies),
+    }
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,127 @@
+"""Binary sensors are updated by the coordinator alone."""
+from collections import Counter
+from datetime import timedelta
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import CONF_API_VERSION, CONF_HOST, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.api import RademacherApi
+from custom_components.rademacher.const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+
+from .simulator import FW_VERSION, MAC_ADDRESS
+
+# Polling at a fixed interval, so the number of poll cycles is known. It
+# is longer than the scan interval of entities which poll themselves.
+POLL_INTERVAL = 60
+DURATION = 120
+SENSORS = 10
+
+
+class StubApi(RademacherApi):
+    """Answers every request without a hub, from a fixed set of rain and
+    sun sensors, and counts the requests by library function.
+    """
+
+    def __init__(self, *args) -> None:
+        super().__init__("stub", "")
+        self.requests: Counter = Counter()
+        self.devices = {
+            str(did): {
+                "capabilities": [
+                    {"name": "ID_DEVICE_LOC", "value": str(did)},
+                    {"name": "DEVICE_TYPE_LOC", "value": "3"},
+                    {"name": "PROT_ID_DEVICE_LOC", "value": f"{did:08x}"},
+                    {"name": "NAME_DEVICE_LOC", "value": f"Sensor {did}"},
+                    {"name": "PROD_CODE_DEVICE_LOC", "value": "00000000"},
+                    {"name": "VERSION_CFG", "value": "1.0"},
+                    {"name": "RAIN_DETECTION_MEA", "value": "false"},
+                    {"name": "SUN_DETECTION_MEA", "value": "false"},
+                ]
+            }
+            for did in range(1, SENSORS + 1)
+        }
+        self.responses = {
+            "get_devices": lambda: list(self.devices.values()),
+            "get_device": lambda did: self.devices[did],
+            "async_get_devices_state": lambda: {
+                did: {
+                    "did": int(did),
+                    "statusValid": True,
+                    "readings": {"rain_detected": False, "sun_detected": False},
+                }
+                for did in self.devices
+            },
+            "async_get_fw_status": lambda: {
+                "update_status": "NO_UPDATE_AVAILABLE",
+                "version": FW_VERSION,
+            },
+            "async_get_fw_version": lambda: {
+                "version": FW_VERSION,
+                "df_stick_version": "2.0",
+                "hw_platform": "ampere",
+                "sw_platform": "hp",
+            },
+            "async_get_led_status": lambda: {"status": "enabled"},
+            "async_get_interfaces": lambda: {
+                "interfaces": {"eth0": {"enabled": True, "address": MAC_ADDRESS}}
+            },
+            "async_get_nodename": lambda: {"nodename": "homepilot"},
+            "async_get_scenes": lambda: [],
+        }
+
+    async def _async_traffic_request(self, name, request, *args):
+        self.requests[name] += 1
+        return self.responses[name](*args)
+
+
+async def test_requests_while_polling(
+    hass: HomeAssistant, monkeypatch, freezer: FrozenDateTimeFactory
+):
+    """Polling costs one bulk request per poll cycle of the coordinator,
+    however many binary sensors there are.
+    """
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.DEFAULT_POLL_INTERVAL",
+        POLL_INTERVAL,
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        unique_id=MAC_ADDRESS,
+        data={CONF_HOST: "stub", CONF_PASSWORD: "", CONF_API_VERSION: 1},
+        options={
+            CONF_FAST_POLL_INTERVAL: POLL_INTERVAL,
+            CONF_SLOW_POLL_INTERVAL: POLL_INTERVAL,
+        },
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.rademacher.RademacherApi", StubApi):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    api: StubApi = state_manager.manager.api
+    assert len(hass.states.async_all("binary_sensor")) == 2 * SENSORS
+    api.requests.clear()
+    cycles = state_manager.poll_durations.total
+
+    for _ in range(DURATION):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    cycles = state_manager.poll_durations.total - cycles
+    # The coordinator adds a random fraction of a second to the interval
+    assert DURATION // POLL_INTERVAL - 1 <= cycles <= DURATION // POLL_INTERVAL
+    assert api.requests == {"async_get_devices_state": cycles}
+    assert await hass.config_entries.async_unload(entry.entry_id)
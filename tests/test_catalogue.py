@@ -0,0 +1,40 @@
+"""Devices and scenes changed on the hub while the entry is loaded."""
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.rademacher import async_sync_devices
+from custom_components.rademacher.const import DOMAIN
+
+from .conftest import async_setup_simulated_entry
+
+
+async def test_cache_saved_only_on_changes(
+    hass: HomeAssistant, hass_storage: dict[str, Any], start_simulator
+):
+    """A sync without changes doesn't save the cached discovery, one with
+    a renamed device does.
+    """
+    simulator = start_simulator(10)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    key = f"{DOMAIN}.{entry.entry_id}.discovery"
+    cached = hass_storage.pop(key)
+    # States are part of the device list, they don't count as changes
+    simulator.change_states(0.5)
+
+    await async_sync_devices(hass, entry)
+    assert key not in hass_storage
+
+    did = simulator.dids("2")[0]
+
+    def rename():
+        simulator.devices[did]["capabilities"][3]["value"] = "Renamed"
+
+    simulator.call(rename)
+    hass_storage[key] = cached
+    await async_sync_devices(hass, entry)
+    assert hass_storage[key]["data"] != cached["data"]
+    device = dr.async_get(hass).async_get_device({(DOMAIN, str(did))})
+    assert device.name == "Renamed"
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,32 @@
+"""Rolling metrics of the communication with the hub."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+
+from custom_components.rademacher.metrics import Histogram
+
+WINDOW = 60
+
+
+async def test_percentile_of_recent_values(freezer: FrozenDateTimeFactory):
+    """Percentiles are bounded by the maximum of the recent windows, not by
+    a value which has rotated out.
+    """
+    histogram = Histogram(window=WINDOW)
+    histogram.add(60.0)
+    assert histogram.percentile(50) == 60.0
+
+    freezer.tick(timedelta(seconds=WINDOW))
+    histogram.add(0.003)
+    assert histogram.percentile(100) == 60.0
+
+    freezer.tick(timedelta(seconds=WINDOW))
+    histogram.add(40.0)
+    assert histogram.percentile(95) == 40.0
+    assert histogram.percentile(50) == 0.005
+    assert histogram.recent_max == 40.0
+    assert histogram.max == 60.0
+
+    freezer.tick(timedelta(seconds=2 * WINDOW))
+    assert histogram.percentile(50) is None
+    assert histogram.recent_max == 0.0
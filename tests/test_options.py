@@ -0,0 +1,60 @@
+"""Options changed while the entry is loaded."""
+from homeassistant.const import CONF_EXCLUDE
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.rademacher.const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+
+from .conftest import async_setup_simulated_entry
+
+
+async def test_include_device_of_new_platform(
+    hass: HomeAssistant, monkeypatch, start_simulator
+):
+    """Including a device whose platform wasn't set up forwards the
+    platform, with the method for forwarding after setup where the core
+    has one.
+    """
+    simulator = start_simulator(10)
+    covers = [str(did) for did in simulator.dids("2")]
+    entry = await async_setup_simulated_entry(hass, simulator, {CONF_EXCLUDE: covers})
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    assert "cover" not in state_manager.platforms
+    assert not hass.states.async_all("cover")
+
+    late_forwards = []
+    forward_entry_setups = hass.config_entries.async_forward_entry_setups
+
+    async def late_forward_entry_setups(entry, platforms):
+        late_forwards.extend(platforms)
+        await forward_entry_setups(entry, platforms)
+
+    monkeypatch.setattr(
+        hass.config_entries,
+        "async_late_forward_entry_setups",
+        late_forward_entry_setups,
+        raising=False,
+    )
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_EXCLUDE: [],
+            CONF_FAST_POLL_INTERVAL: DEFAULT_FAST_POLL_INTERVAL,
+            CONF_SLOW_POLL_INTERVAL: DEFAULT_SLOW_POLL_INTERVAL,
+        },
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    await hass.async_block_till_done()
+
+    assert "cover" in late_forwards
+    assert "cover" in state_manager.platforms
+    assert len(hass.states.async_all("cover")) == len(covers)
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,64 @@
+"""Hub traffic caused by polling."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.const import (
+    CONF_FAST_POLL_INTERVAL,
+    CONF_SLOW_POLL_INTERVAL,
+    DOMAIN,
+)
+from custom_components.rademacher.state_manager import UNCHANGED_STATE_MAX_AGE
+
+from .conftest import async_setup_simulated_entry
+
+
+# Polling at a fixed interval, so the number of poll cycles is known. It
+# is longer than the scan interval of entities which poll themselves.
+POLL_INTERVAL = 60
+DURATION = 120
+
+
+@pytest.mark.parametrize("devices", [10, 50])
+async def test_requests_while_polling(
+    hass: HomeAssistant,
+    monkeypatch,
+    freezer: FrozenDateTimeFactory,
+    start_simulator,
+    devices,
+):
+    """Polling costs three bulk requests per poll cycle of the coordinator
+    and nothing else, however many entities (eg. binary sensors) there are.
+    """
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.DEFAULT_POLL_INTERVAL",
+        POLL_INTERVAL,
+    )
+    simulator = start_simulator(devices)
+    entry = await async_setup_simulated_entry(
+        hass,
+        simulator,
+        {CONF_FAST_POLL_INTERVAL: POLL_INTERVAL, CONF_SLOW_POLL_INTERVAL: POLL_INTERVAL},
+    )
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.async_all("binary_sensor")
+    simulator.requests.clear()
+    cycles = state_manager.poll_durations.total
+
+    for _ in range(DURATION):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    cycles = state_manager.poll_durations.total - cycles
+    # The coordinator adds a random fraction of a second to the interval
+    assert DURATION // POLL_INTERVAL - 1 <= cycles <= DURATION // POLL_INTERVAL
+    details = simulator.requests.pop(("GET", "/devices/{did}"), 0)
+    # Unchanged covers still read their details once in a while
+    assert details <= len(simulator.dids("2")) * (DURATION // UNCHANGED_STATE_MAX_AGE)
+    assert simulator.requests == {("GET", "/v4/devices"): 3 * cycles}
+    assert await hass.config_entries.async_unload(entry.entry_id)
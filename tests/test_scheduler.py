@@ -0,0 +1,44 @@
+"""Commands and polls sharing the requests to the hub."""
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.const import DOMAIN
+
+from .conftest import async_setup_simulated_entry
+
+# Seconds used in place of MAX_POLL_DEFER and COMMAND_TIMEOUT
+MAX_POLL_DEFER = 0.2
+COMMAND_TIMEOUT = 0.5
+
+
+async def test_stalled_command(hass: HomeAssistant, monkeypatch, start_simulator):
+    """A command which never finishes defers the poll only for a while,
+    and times out itself.
+    """
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.MAX_POLL_DEFER", MAX_POLL_DEFER
+    )
+    monkeypatch.setattr(
+        "custom_components.rademacher.state_manager.COMMAND_TIMEOUT", COMMAND_TIMEOUT
+    )
+    simulator = start_simulator(10)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    state_manager = hass.data[DOMAIN][entry.entry_id]
+
+    async def stalled_command():
+        await asyncio.Event().wait()
+
+    command = hass.async_create_task(state_manager.async_send_command(stalled_command))
+    await asyncio.sleep(0)
+    async with asyncio.timeout(COMMAND_TIMEOUT):
+        await state_manager.coordinator.async_refresh()
+    assert state_manager.coordinator.last_update_success
+    assert not command.done()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await command
+    assert state_manager.timeouts["command"] == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,67 @@
+"""Saving the device states between restarts."""
+from datetime import timedelta
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.rademacher.const import DOMAIN
+from custom_components.rademacher.state_manager import STATES_SAVE_DELAY
+
+from .conftest import async_setup_simulated_entry
+
+
+async def async_change_states(hass: HomeAssistant, simulator, entry):
+    """Change the states of some devices and poll them."""
+    simulator.change_states(0.5)
+    await hass.data[DOMAIN][entry.entry_id].coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+async def async_wait_save_delay(hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+    """Let the time of the delayed save pass."""
+    freezer.tick(timedelta(seconds=STATES_SAVE_DELAY + 1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_states_saved_on_unload(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+    start_simulator,
+):
+    """Changed states are saved when the entry is unloaded, without
+    waiting for the delayed save, which doesn't happen afterwards.
+    """
+    simulator = start_simulator(10)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    key = f"{DOMAIN}.{entry.entry_id}.states"
+    await async_change_states(hass, simulator, entry)
+    assert key not in hass_storage
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert hass_storage[key]["data"]
+    del hass_storage[key]
+    await async_wait_save_delay(hass, freezer)
+    assert key not in hass_storage
+
+
+async def test_states_removed_with_entry(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+    start_simulator,
+):
+    """A pending save doesn't recreate the states of a removed entry."""
+    simulator = start_simulator(10)
+    entry = await async_setup_simulated_entry(hass, simulator)
+    key = f"{DOMAIN}.{entry.entry_id}.states"
+    await async_change_states(hass, simulator, entry)
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    await async_wait_save_delay(hass, freezer)
+    assert key not in hass_storage